@@ -1,2 +1,64 @@
+import time
+
+from pacumen.mechanics import search
+from pacumen.mechanics.agent import Agent
+from pacumen.mechanics.agent_direction import Direction
+from pacumen.mechanics.search_problem import PositionSearchProblem
+
+
 class GreedyAgent:
     pass
+
+
+class SearchAgent(Agent):
+    """
+    An agent that plans a path to a goal position when the game starts and
+    then follows it. The goal is the bottom left corner of the layout. The
+    search is chosen by name with the fn option, from those of the search
+    module: dfs, bfs, ucs, astar, greedy, bidirectional or jps. The astar
+    and greedy searches also take a heuristic option, null or manhattan.
+    For example:
+
+        pacumen -l big_maze -p SearchAgent -a fn=jps
+    """
+    def __init__(self, fn='bfs', heuristic='null', index=0):
+        if fn not in search.SEARCH_FUNCTIONS:
+            raise Exception("Unknown search function: " + str(fn))
+
+        if heuristic not in search.HEURISTICS:
+            raise Exception("Unknown heuristic: " + str(heuristic))
+
+        self.search_function = search.SEARCH_FUNCTIONS[fn]
+
+        if fn in ['astar', 'greedy']:
+            search_function = self.search_function
+            self.search_function = lambda problem: search_function(problem, search.HEURISTICS[heuristic])
+
+        self.actions = []
+        self.action_index = 0
+
+        super().__init__(index)
+
+    def process_initial_state(self, state):
+        problem = PositionSearchProblem(state)
+
+        started = time.time()
+        result = self.search_function(problem)
+        elapsed = time.time() - started
+
+        if result.actions is None:
+            raise Exception("No path to the goal could be found.")
+
+        self.actions = result.actions
+        self.action_index = 0
+
+        print("Path found with total cost of %d in %.3f seconds" % (result.cost, elapsed))
+        print("Search nodes expanded: %d" % result.expanded)
+
+    def get_action(self, state):
+        if self.action_index < len(self.actions):
+            action = self.actions[self.action_index]
+            self.action_index += 1
+            return action
+
+        return Direction.STOP
@@ -0,0 +1,113 @@
+"""
+Measures how fast breadth-first search expands states on the bundled
+search layouts, with the Queue of the structures module and with a queue
+that pushes by inserting at the front of a list, as Queue used to.
+
+The problem searched is eating all of the dots, where a state is the
+position of Pacumen along with the dots left. The number of states grows
+quickly, so the frontier gets large and the cost of each push shows. Each
+search stops once it has expanded a fixed number of states. Run this from
+the project root:
+
+    python3 -m benchmarks.breadth_first_search
+"""
+import sys
+import time
+
+from pacumen.mechanics import layout
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.agent_direction import Direction
+from pacumen.mechanics.search_problem import SearchProblem
+from pacumen.mechanics.structures import Queue
+
+LAYOUTS = ["tiny_search", "medium_search", "big_search", "tricky_search"]
+MAX_EXPANSIONS = 100000
+
+
+class ListQueue:
+    """
+    The earlier Queue, which pushes each item on to the front of a list.
+    """
+    def __init__(self):
+        self.list = []
+
+    def push(self, item):
+        self.list.insert(0, item)
+
+    def pop(self):
+        return self.list.pop()
+
+    def is_empty(self):
+        return len(self.list) == 0
+
+
+class DotSearchProblem(SearchProblem):
+    def __init__(self, game_layout):
+        self.legal_actions = game_layout.legal_actions
+        self.start = (game_layout.agent_positions[0][1], game_layout.dots)
+
+    def get_start_state(self):
+        return self.start
+
+    def is_goal_state(self, state):
+        return state[1].count() == 0
+
+    def get_successors(self, state):
+        position, dots = state
+        successors = []
+
+        for action in self.legal_actions[position]:
+            if action == Direction.STOP:
+                continue
+
+            dx, dy = Actions.directions[action]
+            x, y = position[0] + dx, position[1] + dy
+            next_dots = dots.copy_with(x, y, False) if dots[x][y] else dots
+            successors.append((((x, y), next_dots), action, 1))
+
+        return successors
+
+
+def breadth_first_search(problem, frontier, max_expansions):
+    """
+    Returns the number of states expanded before finding the goal or
+    reaching the maximum number of expansions.
+    """
+    start = problem.get_start_state()
+    frontier.push(start)
+    reached = {start}
+    expanded = 0
+
+    while not frontier.is_empty() and expanded < max_expansions:
+        state = frontier.pop()
+
+        if problem.is_goal_state(state):
+            break
+
+        expanded += 1
+
+        for successor, _, _ in problem.get_successors(state):
+            if successor not in reached:
+                reached.add(successor)
+                frontier.push(successor)
+
+    return expanded
+
+
+def run(max_expansions=MAX_EXPANSIONS):
+    print("%-15s %10s %15s %15s" % ("Layout", "Expanded", "List/second", "Queue/second"))
+
+    for name in LAYOUTS:
+        problem = DotSearchProblem(layout.get_layout(name))
+        rates = []
+
+        for frontier_class in [ListQueue, Queue]:
+            start = time.perf_counter()
+            expanded = breadth_first_search(problem, frontier_class(), max_expansions)
+            rates.append(expanded / (time.perf_counter() - start))
+
+        print("%-15s %10d %15.0f %15.0f" % (name, expanded, rates[0], rates[1]))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else MAX_EXPANSIONS)
@@ -0,0 +1,73 @@
+"""
+Measures the speed of the game loop over long games with four ghosts.
+
+The Pacumen agent here keeps as far from the ghosts as it can, which
+keeps each game going for a long time, and both it and the ghosts choose
+their actions cheaply, so most of the time is spent in the game loop
+rather than in the agents. Run this from the project root:
+
+    python3 -m benchmarks.game_loop
+"""
+import sys
+import time
+import random
+
+from pacumen.mechanics import layout
+from pacumen.mechanics.agent import Agent
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.agent_direction import Direction
+from pacumen.library.utilities import manhattan_distance
+from pacumen.rules.game_rules import GameRules
+from pacumen.displays.textual_pacman import NoDisplay
+from agents_ghost import RandomGhost
+
+LAYOUT = "medium_scary_maze"
+NUM_GAMES = 20
+NUM_GHOSTS = 4
+
+
+class FleeingAgent(Agent):
+    """
+    Takes the action that leaves it furthest from the nearest ghost.
+    """
+    def get_action(self, state):
+        x, y = state.get_pacumen_position()
+        ghosts = state.get_ghost_positions()
+        best_distance, best_action = -1, Direction.STOP
+
+        for action in state.get_legal_actions(self.index):
+            dx, dy = Actions.direction_to_vector(action)
+            position = (x + dx, y + dy)
+            distance = min(manhattan_distance(position, ghost) for ghost in ghosts)
+
+            if distance > best_distance:
+                best_distance, best_action = distance, action
+
+        return best_action
+
+
+def run(num_games=NUM_GAMES):
+    game_layout = layout.get_layout(LAYOUT)
+    rules = GameRules()
+    plies = 0
+
+    random.seed("pacumen")
+    start = time.perf_counter()
+
+    for _ in range(num_games):
+        ghosts = [RandomGhost(i + 1) for i in range(NUM_GHOSTS)]
+        game = rules.new_game(game_layout, FleeingAgent(), ghosts, NoDisplay(), quiet=True)
+        game.run()
+        plies += len(game.move_history)
+
+    elapsed = time.perf_counter() - start
+
+    print("Layout:          %s (%d ghosts)" % (LAYOUT, NUM_GHOSTS))
+    print("Games:           %d" % num_games)
+    print("Plies:           %d (%.0f per game)" % (plies, plies / float(num_games)))
+    print("Time:            %.2fs" % elapsed)
+    print("Plies/second:    %.0f" % (plies / elapsed))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_GAMES)
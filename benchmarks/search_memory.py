@@ -0,0 +1,116 @@
+"""
+Measures the peak memory used by depth-first and breadth-first search on
+the bundled mazes, finding a path from the start of Pacumen to the bottom
+left corner.
+
+Each search is done twice. Once with each node on the frontier being a
+Node that holds the whole path to its state, which is copied for every
+successor, and once with the search module, which keeps its nodes in a
+NodeArena. Both find the same path. Depth-first search keeps many deep
+nodes on its frontier, which is where whole paths cost the most. Run
+this from the project root:
+
+    python3 -m benchmarks.search_memory
+"""
+import tracemalloc
+
+from pacumen.mechanics import layout
+from pacumen.mechanics import search
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.agent_direction import Direction
+from pacumen.mechanics.search_problem import SearchProblem
+from pacumen.mechanics.structures import Node, Stack, Queue
+
+LAYOUTS = ["medium_maze", "big_maze", "open_maze"]
+
+
+class CornerSearchProblem(SearchProblem):
+    def __init__(self, game_layout):
+        self.legal_actions = game_layout.legal_actions
+        self.start = game_layout.agent_positions[0][1]
+
+    def get_start_state(self):
+        return self.start
+
+    def is_goal_state(self, state):
+        return state == (1, 1)
+
+    def get_successors(self, state):
+        successors = []
+
+        for action in self.legal_actions[state]:
+            if action == Direction.STOP:
+                continue
+
+            dx, dy = Actions.directions[action]
+            successors.append(((state[0] + dx, state[1] + dy), action, 1))
+
+        return successors
+
+
+def node_search(problem, frontier, revisit):
+    """
+    Searches in the same way as search.uninformed_search, but with each
+    node holding the path to its state.
+    """
+    start = problem.get_start_state()
+    seen = set() if revisit else {start}
+    frontier.push(Node(start))
+
+    while not frontier.is_empty():
+        node = frontier.pop()
+
+        if revisit:
+            if node.state in seen:
+                continue
+
+            seen.add(node.state)
+
+        if problem.is_goal_state(node.state):
+            return node.path
+
+        for successor, action, _ in problem.get_successors(node.state):
+            if successor in seen:
+                continue
+
+            if not revisit:
+                seen.add(successor)
+
+            frontier.push(Node(successor, node.path + [action]))
+
+    return None
+
+
+SEARCHES = [
+    ("DFS", lambda problem: node_search(problem, Stack(), True), search.depth_first_search),
+    ("BFS", lambda problem: node_search(problem, Queue(), False), search.breadth_first_search)
+]
+
+
+def measure(function, problem):
+    tracemalloc.start()
+    result = function(problem)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, peak
+
+
+def run():
+    print("%-15s %-6s %8s %15s %15s" % ("Layout", "Search", "Length", "Node bytes", "Arena bytes"))
+
+    for name in LAYOUTS:
+        problem = CornerSearchProblem(layout.get_layout(name))
+
+        for label, node_function, arena_function in SEARCHES:
+            path, node_peak = measure(node_function, problem)
+            result, arena_peak = measure(arena_function, problem)
+
+            if path != result.actions:
+                raise Exception("The searches found different paths on " + name + ".")
+
+            print("%-15s %-6s %8d %15d %15d" % (name, label, len(path), node_peak, arena_peak))
+
+
+if __name__ == "__main__":
+    run()
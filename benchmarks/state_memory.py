@@ -0,0 +1,68 @@
+"""
+Measures the memory taken by game states kept in a replay buffer.
+
+Random play is used to generate successor states, every one of which is
+kept, as a learning agent would keep them in a replay buffer. The memory
+is measured with tracemalloc. Run this from the project root:
+
+    python3 -m benchmarks.state_memory
+"""
+import sys
+import random
+import tracemalloc
+
+from pacumen.mechanics import layout
+from pacumen.mechanics.game_state import GameState
+
+LAYOUT = "medium_classic"
+NUM_STATES = 20000
+
+
+def generate_states(game_layout, num_states):
+    start = GameState()
+    start.initialize(game_layout)
+
+    states = []
+    state = start
+    agent_index = 0
+
+    while len(states) < num_states:
+        if state.is_win() or state.is_loss():
+            state = start
+            agent_index = 0
+
+        state = state.generate_successor(agent_index, random.choice(state.get_legal_actions(agent_index)))
+        states.append(state)
+        agent_index = (agent_index + 1) % state.get_num_agents()
+
+    return states
+
+
+def run(num_states=NUM_STATES):
+    # Load the layout before measuring, so only the states are counted.
+    # The states are also generated once beforehand, so that the Zobrist
+    # keys, which are made the first time each one is needed and are then
+    # shared by all states, are not counted either.
+    game_layout = layout.get_layout(LAYOUT)
+
+    random.seed("pacumen")
+    generate_states(game_layout, num_states)
+    random.seed("pacumen")
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    states = generate_states(game_layout, num_states)
+
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("Layout:          %s" % LAYOUT)
+    print("States kept:     %d" % len(states))
+    print("Memory:          %.1f KiB" % ((after - before) / 1024.0))
+    print("Bytes per state: %.0f" % ((after - before) / float(len(states))))
+    print("Peak:            %.1f KiB" % ((peak - before) / 1024.0))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_STATES)
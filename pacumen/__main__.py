@@ -15,11 +15,17 @@ if sys.version_info < (3, 0):
     sys.exit(1)
 
 
-def run_game(game_layout, pacumen, ghosts, game_display, num_games, num_training=0, record_actions=False):
+def run_game(game_layout, pacumen, ghosts, game_display, num_games, num_training=0, record_actions=False,
+             workers=None):
     """
     This method is the actual starting point for execution of a game, taking
     in many values that were passed in as options from the command line. To
     run a game requires creating a new game, based on certain game rules.
+
+    If a number of workers is provided, the games are played in batch mode.
+    Any training games are still played here, one after the other, since
+    learning agents build on each one. The remaining games are independent
+    of each other and are spread across a pool of worker processes.
     """
     # noinspection PyUnresolvedReferences
     import __main__
@@ -28,7 +34,9 @@ def run_game(game_layout, pacumen, ghosts, game_display, num_games, num_training
     rules = GameRules()
     games = []
 
-    for play_session in range(num_games):
+    num_played = num_training if workers else num_games
+
+    for play_session in range(num_played):
         quiet_execution = play_session < num_training
 
         if quiet_execution:
@@ -46,14 +54,16 @@ def run_game(game_layout, pacumen, ghosts, game_display, num_games, num_training
             games.append(game)
 
         if record_actions:
-            import time
-            import pickle
+            record_game(game_layout, game, play_session)
 
-            file_name = ('recorded-game-%d' % (play_session + 1)) + '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = open(file_name, 'wb')
-            components = {'game_layout': game_layout, 'game_actions': game.move_history}
-            pickle.dump(components, f)
-            f.close()
+    if workers:
+        batch_games = run_batch(game_layout, pacumen, ghosts, num_training, num_games, workers)
+
+        for play_session, game in zip(range(num_training, num_games), batch_games):
+            games.append(game)
+
+            if record_actions:
+                record_game(game_layout, game, play_session)
 
     if num_games - num_training > 0:
         scores = [game.state.get_score() for game in games]
@@ -68,6 +78,98 @@ def run_game(game_layout, pacumen, ghosts, game_display, num_games, num_training
     return games
 
 
+def record_game(game_layout, game, play_session):
+    import time
+    import pickle
+
+    file_name = ('recorded-game-%d' % (play_session + 1)) + '-'.join([str(t) for t in time.localtime()[1:6]])
+    f = open(file_name, 'wb')
+    components = {'game_layout': game_layout, 'game_actions': game.move_history}
+    pickle.dump(components, f)
+    f.close()
+
+
+# The layout and agents for the games played by a batch worker process.
+# These are kept pickled so that each game starts from fresh copies of
+# the agents, no matter which games the worker played before.
+BATCH_GAME_COMPONENTS = None
+
+
+def run_batch(game_layout, pacumen, ghosts, first_game, num_games, workers):
+    """
+    Plays the games from first_game up to num_games across a pool of worker
+    processes and returns the finished games in order. Each game is given
+    its own seed, made from a base seed and the number of the game. This
+    means the same games are played no matter how many workers there are
+    or which worker ends up playing which game. The base seed is drawn
+    from the random module, so --fixRandomSeed makes a batch repeatable.
+    """
+    import multiprocessing
+    from pacumen.displays import textual_pacman
+
+    if first_game >= num_games:
+        return []
+
+    base_seed = random.getrandbits(32)
+    seeds = ['%d-%d' % (base_seed, play_session) for play_session in range(first_game, num_games)]
+    chunk_size = max(1, len(seeds) // (workers * 4))
+
+    pool = multiprocessing.Pool(workers, initialize_batch_worker, (game_layout, pacumen, ghosts))
+
+    try:
+        results = pool.map(run_batch_game, seeds, chunk_size)
+    finally:
+        pool.close()
+        pool.join()
+
+    # Each game is put back together from its final state and moves. The
+    # agents of these games are the ones passed in, rather than the copies
+    # that played in the workers.
+    rules = GameRules()
+    games = []
+
+    for state, move_history, agent_crashed in results:
+        state.data.layout = game_layout
+
+        game = rules.new_game(game_layout, pacumen, ghosts, textual_pacman.NoDisplay(), True)
+        game.state = state
+        game.move_history = move_history
+        game.agent_crashed = agent_crashed
+        game.game_over = True
+        games.append(game)
+
+    return games
+
+
+def initialize_batch_worker(game_layout, pacumen, ghosts):
+    import pickle
+
+    global BATCH_GAME_COMPONENTS
+    BATCH_GAME_COMPONENTS = pickle.dumps((game_layout, pacumen, ghosts))
+
+
+def run_batch_game(seed):
+    import pickle
+    from pacumen.displays import textual_pacman
+
+    game_layout, pacumen, ghosts = pickle.loads(BATCH_GAME_COMPONENTS)
+
+    random.seed(seed)
+
+    rules = GameRules()
+    game = rules.new_game(game_layout, pacumen, ghosts, textual_pacman.NoDisplay(), True)
+    game.run()
+
+    # Only the final state and the moves are sent back. The game itself
+    # holds the agents, the layout and the output of the agents, all of
+    # which would have to be pickled for every game. The layout is left
+    # out of the state as well, since the main process already has it.
+    state = game.state
+    state.data.layout = None
+
+    return state, game.move_history, game.agent_crashed
+
+
 def replay_game(game_layout, game_actions, game_display):
     from agents_ghost import RandomGhost
     from agents_pacumen import GreedyAgent
@@ -112,6 +214,9 @@ def process_command(arguments):
                     
                 (2) pacumen --layout small_classic --zoom 2
                     - starts an interactive game on a smaller board, zoomed in
+                    
+                (3) pacumen --layout big_maze --pacman SearchAgent --agentArgs fn=jps
+                    - finds a path through a maze with jump point search
             """
         ),
         epilog=textwrap.dedent(
@@ -151,6 +256,8 @@ def process_command(arguments):
     -t, --textDisplay            display game output as text only.
     
     -q, --quiet                  generate minimal output, no display.
+    
+    -w, --workers <number>       play the games in batch mode across this many processes; requires -q.
     """
 
     learn_opt = parser.add_argument_group(title='learning options', description=textwrap.dedent(learn_opt_desc))
@@ -165,6 +272,8 @@ def process_command(arguments):
     learn_opt.add_argument("-q", "--quiet", dest="quiet_display", default=False, action="store_true",
                            help=argparse.SUPPRESS)
 
+    learn_opt.add_argument("-w", "--workers", dest="workers", type=int, default=None, help=argparse.SUPPRESS)
+
     # ==============
 
     env_opt_desc = """
@@ -283,6 +392,18 @@ def process_command(arguments):
     args['num_games'] = options.num_games
     args['record_actions'] = options.record_actions
 
+    # Batch mode plays games in other processes, where there is no display
+    # to draw them on.
+
+    if options.workers is not None:
+        if options.workers < 1:
+            raise Exception("The number of workers must be at least 1.")
+
+        if not options.quiet_display:
+            raise Exception("Playing games across workers requires the quiet display (-q).")
+
+        args['workers'] = options.workers
+
     # Recorded games don't use the run_game method or the argument structure.
 
     if options.replay_actions is not None:
@@ -382,6 +503,11 @@ def verify_graphical_pacman():
 
 
 def verify_functionality(argument):
+    # The checks shouldn't leave anything behind, so the maze distances
+    # are worked out without being cached.
+    from pacumen.mechanics import maze_distances
+    maze_distances.CACHE_DIRECTORY = None
+
     options = {
         "graphical_pacman": verify_graphical_pacman,
         "graphical_builder": verify_graphical_builder,
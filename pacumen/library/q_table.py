@@ -0,0 +1,172 @@
+from array import array
+
+
+class QTable:
+    """
+    Provides storage for the Q-values of a learning agent. A Counter can
+    be used for this, but every read of a Counter inserts the key that was
+    read, so a Counter used as a Q-table grows with every state the agent
+    merely looks at.
+
+    Here each state is given a row when a value is first stored for it.
+    The actions are the columns, with each action given a small integer
+    code; by default these are the direction codes of Actions. All of the
+    values are held in a single array of doubles, with the value of a
+    state and action at row * number of actions + column. Reading the
+    value of a state that has no row returns the default value and
+    stores nothing.
+
+    States can be stored as they are or turned into a compact key by the
+    provided encode function. For a GameState a good key is the Zobrist
+    key of its data, as given by get_zobrist_key, which is a single
+    integer rather than a whole state.
+    """
+    def get_row(self, state):
+        return self.rows.get(self.encode(state) if self.encode else state)
+
+    def add_row(self, state):
+        key = self.encode(state) if self.encode else state
+        row = self.rows.get(key)
+
+        if row is None:
+            row = len(self.rows)
+            self.rows[key] = row
+            self.values.extend(self.empty_row)
+
+        return row
+
+    def get_q_value(self, state, action):
+        row = self.get_row(state)
+
+        if row is None:
+            return self.default
+
+        return self.values[row * len(self.actions) + self.action_codes[action]]
+
+    def set_q_value(self, state, action, value):
+        row = self.add_row(state)
+        self.values[row * len(self.actions) + self.action_codes[action]] = value
+
+    def update(self, state, action, target, alpha):
+        """
+        Moves the Q-value of the state and action toward the target by the
+        learning rate alpha and returns the new value.
+        """
+        row = self.add_row(state)
+        index = row * len(self.actions) + self.action_codes[action]
+        value = self.values[index] + alpha * (target - self.values[index])
+        self.values[index] = value
+
+        return value
+
+    def get_q_values(self, state, actions=None):
+        """
+        Returns the Q-values of the state for the provided actions, or for
+        all actions if none are provided.
+        """
+        if actions is None:
+            actions = self.actions
+
+        row = self.get_row(state)
+
+        if row is None:
+            return [self.default] * len(actions)
+
+        start = row * len(self.actions)
+        values = self.values
+
+        return [values[start + self.action_codes[action]] for action in actions]
+
+    def get_value(self, state, actions=None):
+        """
+        Returns the largest Q-value of the state over the provided actions,
+        or over all actions if none are provided. If there are no actions,
+        as in a terminal state, the value is 0.
+        """
+        q_values = self.get_q_values(state, actions)
+
+        if not q_values:
+            return 0.0
+
+        return max(q_values)
+
+    def get_best_action(self, state, actions=None):
+        """
+        Returns the action with the largest Q-value from the provided
+        actions, or from all actions if none are provided. Ties go to the
+        first of the actions. If there are no actions, None is returned.
+        """
+        if actions is None:
+            actions = self.actions
+
+        q_values = self.get_q_values(state, actions)
+
+        if not q_values:
+            return None
+
+        return actions[max(range(len(q_values)), key=q_values.__getitem__)]
+
+    def save(self, file_name):
+        """
+        Writes the table to a file, so a long training run can be picked
+        up again later. The keys of the states have to be picklable.
+        """
+        try:
+            import pickle
+        except ImportError:
+            raise Exception("Pickle not installed.")
+
+        components = {
+            'actions': self.actions,
+            'default': self.default,
+            'keys': list(self.rows),
+            'values': self.values.tobytes()
+        }
+
+        with open(file_name, 'wb') as f:
+            pickle.dump(components, f, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(file_name, encode=None):
+        """
+        Reads a table written by save. The encode function isn't saved
+        with the table, so the one used when the table was built has to
+        be provided again.
+        """
+        try:
+            import pickle
+        except ImportError:
+            raise Exception("Pickle not installed.")
+
+        with open(file_name, 'rb') as f:
+            components = pickle.load(f)
+
+        table = QTable(components['actions'], encode, components['default'])
+        table.rows = dict((key, row) for row, key in enumerate(components['keys']))
+        table.values = array('d')
+        table.values.frombytes(components['values'])
+
+        if len(table.values) != len(table.rows) * len(table.actions):
+            raise Exception("The Q-table in " + str(file_name) + " is not complete.")
+
+        return table
+
+    def __init__(self, actions=None, encode=None, default=0.0):
+        if actions is None:
+            from pacumen.mechanics.agent_action import Actions
+            actions = Actions.code_to_direction
+
+        self.actions = list(actions)
+        self.action_codes = dict((action, code) for code, action in enumerate(self.actions))
+        self.encode = encode
+        self.default = default
+
+        self.rows = {}
+        self.values = array('d')
+        self.empty_row = array('d', [default]) * len(self.actions)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, state):
+        return self.get_row(state) is not None
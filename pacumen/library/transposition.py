@@ -0,0 +1,183 @@
+from collections import OrderedDict
+
+
+class TranspositionEntry:
+    """
+    Holds what is known about a searched state: the value found for it,
+    how deep the search below it went, what kind of bound the value is
+    and, optionally, the best action that was found.
+    """
+    def __init__(self, value, depth, bound, action=None):
+        self.value = value
+        self.depth = depth
+        self.bound = bound
+        self.action = action
+
+    def __repr__(self):
+        return "({0},{1},{2},{3})".format(self.value, self.depth, self.bound, self.action)
+
+
+class TranspositionTable:
+    """
+    Provides a bounded cache for adversarial search. Identical states are
+    often reached through different orders of moves. Storing the value of
+    each searched state means those states don't have to be searched all
+    over again. States are the keys, so they must support hashing and
+    equality, as GameState does.
+
+    A value is either exact or a bound. A lower bound is a value where
+    the search was cut off because it was too good (value >= beta), and
+    an upper bound is one where nothing was better than alpha.
+
+    When the table is full an entry has to be replaced. With the LRU
+    policy the least recently used entry goes. With the DEPTH policy the
+    shallowest of the least recently used entries goes, and an entry is
+    never overwritten by a shallower search of the same state, since a
+    deeper search is more valuable to keep.
+    """
+    EXACT = 'Exact'
+    LOWER = 'Lower'
+    UPPER = 'Upper'
+
+    LRU = 'LRU'
+    DEPTH = 'Depth'
+
+    # How many of the least recently used entries the DEPTH policy looks
+    # at when choosing an entry to replace.
+    REPLACEMENT_SAMPLE = 4
+
+    def lookup(self, state):
+        """
+        Returns the entry for the state, or None if there isn't one. This
+        is not counted in the statistics, which are only about probes.
+        """
+        entry = self.entries.get(state)
+
+        if entry is not None:
+            self.entries.move_to_end(state)
+
+        return entry
+
+    def probe(self, state, depth, alpha, beta):
+        """
+        Returns a value for the state that can be used in place of a
+        search to the provided depth within the alpha and beta bounds. If
+        no such value is stored, None is returned.
+
+        Only a probe that returns a value is counted as a hit. A probe
+        that finds an entry from a search that was too shallow is counted
+        as shallow, and one that finds a bound which doesn't cut off the
+        search is counted as unusable.
+        """
+        entry = self.lookup(state)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.depth < depth:
+            self.shallow += 1
+            return None
+
+        usable = (entry.bound == TranspositionTable.EXACT
+                  or (entry.bound == TranspositionTable.LOWER and entry.value >= beta)
+                  or (entry.bound == TranspositionTable.UPPER and entry.value <= alpha))
+
+        if usable:
+            self.hits += 1
+            return entry.value
+
+        self.unusable += 1
+        return None
+
+    def store(self, state, value, depth, bound=EXACT, action=None):
+        entry = self.entries.get(state)
+
+        if entry is not None:
+            if self.replacement == TranspositionTable.DEPTH and entry.depth > depth:
+                self.entries.move_to_end(state)
+                return
+
+            self.replacements += 1
+        elif len(self.entries) >= self.capacity:
+            self.evict()
+
+        self.entries[state] = TranspositionEntry(value, depth, bound, action)
+        self.entries.move_to_end(state)
+        self.stores += 1
+
+    def evict(self):
+        if self.replacement == TranspositionTable.LRU:
+            self.entries.popitem(last=False)
+        else:
+            oldest = []
+
+            for state, entry in self.entries.items():
+                oldest.append((entry.depth, len(oldest), state))
+
+                if len(oldest) == TranspositionTable.REPLACEMENT_SAMPLE:
+                    break
+
+            _, _, state = min(oldest)
+            del self.entries[state]
+
+        self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_statistics(self):
+        self.hits = 0
+        self.misses = 0
+        self.shallow = 0
+        self.unusable = 0
+        self.stores = 0
+        self.replacements = 0
+        self.evictions = 0
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses + self.shallow + self.unusable
+
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / float(lookups)
+
+    def get_statistics(self):
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'shallow': self.shallow,
+            'unusable': self.unusable,
+            'hit_rate': self.get_hit_rate(),
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'evictions': self.evictions
+        }
+
+    def __init__(self, capacity=100000, replacement=DEPTH):
+        if capacity < 1:
+            raise Exception("A transposition table must hold at least one entry.")
+
+        if replacement not in [TranspositionTable.LRU, TranspositionTable.DEPTH]:
+            raise Exception("Unknown replacement policy: " + str(replacement))
+
+        self.capacity = capacity
+        self.replacement = replacement
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.shallow = 0
+        self.unusable = 0
+        self.stores = 0
+        self.replacements = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, state):
+        return state in self.entries
@@ -0,0 +1,46 @@
+import random
+
+
+class ZobristTable:
+    """
+    Provides the random keys used for Zobrist hashing. Each feature of a
+    state, such as a dot at a given position, is given its own random
+    64-bit key. The hash of a state is then the exclusive or of the keys
+    of all of its features. Since exclusive or undoes itself, a feature
+    can be added to or removed from a hash by combining its key with that
+    hash, without looking at the rest of the state.
+
+    Keys are created the first time a feature is asked for. Each key is
+    drawn from a generator seeded by the feature itself, which means the
+    same feature has the same key in every process.
+    """
+    BITS = 64
+
+    def get_key(self, *feature):
+        key = self.keys.get(feature)
+
+        if key is None:
+            seed = "%s:%r" % (self.seed, self.canonical(feature))
+            key = random.Random(seed).getrandbits(self.BITS)
+            self.keys[feature] = key
+
+        return key
+
+    @staticmethod
+    def canonical(feature):
+        """
+        Equal features must be given the same key. A position can be held
+        as (9, 5) or as (9.0, 5.0), which are equal but have different
+        representations, so whole numbers are always written as integers.
+        """
+        if isinstance(feature, tuple):
+            return tuple(ZobristTable.canonical(part) for part in feature)
+
+        if isinstance(feature, float) and feature.is_integer():
+            return int(feature)
+
+        return feature
+
+    def __init__(self, seed="pacumen"):
+        self.seed = seed
+        self.keys = {}
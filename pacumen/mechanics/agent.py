@@ -2,6 +2,11 @@ from pacumen.library.utilities import raise_not_defined
 
 
 class Agent:
+    # Agents are given a read-only view of the game state as their
+    # observation. An agent that changes its observation must set this to
+    # True, which gives it a deep copy of the state instead.
+    copy_observations = False
+
     def __init__(self, index=0):
         self.index = index
 
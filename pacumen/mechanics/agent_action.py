@@ -1,6 +1,28 @@
 from pacumen.mechanics.agent_direction import Direction
 
 
+def masks_to_directions(directions):
+    """
+    Returns a table giving, for every bit mask over the provided list of
+    directions, the tuple of directions whose bits are set. The directions
+    are always in the order of the list.
+    """
+    table = []
+
+    for mask in range(1 << len(directions)):
+        table.append(tuple(direction for code, direction in enumerate(directions) if mask & (1 << code)))
+
+    return table
+
+
+def reverse_codes(directions):
+    """
+    Returns a table giving, for the code of each direction in the provided
+    list, the code of the reverse direction.
+    """
+    return [directions.index(Direction.REVERSE[direction]) for direction in directions]
+
+
 class Actions:
     TOLERANCE = .001
 
@@ -14,8 +36,34 @@ class Actions:
 
     directions_as_list = list(directions.items())
 
+    # Internally each direction also has a small integer code, which is its
+    # position in directions_as_list. The tables below are indexed by those
+    # codes. A set of directions can then be held as a bit mask, with the
+    # bit for a code being 1 << code, so that working with sets of actions
+    # is done by indexing and bit operations rather than by comparing and
+    # removing directions. The public Direction values are unchanged.
+    code_to_direction = [direction for direction, _ in directions_as_list]
+    direction_to_code = dict((direction, code) for code, direction in enumerate(code_to_direction))
+    code_to_vector = [vector for _, vector in directions_as_list]
+    code_to_reverse = reverse_codes(code_to_direction)
+    STOP_BIT = 1 << direction_to_code[Direction.STOP]
+
+    mask_to_directions = masks_to_directions(code_to_direction)
+
     @staticmethod
-    def get_possible_actions(config, walls):
+    def get_possible_actions(config, walls, legal_actions=None):
+        """
+        Returns the actions possible from a configuration. A table of the
+        legal actions for each grid position, such as the one a Layout
+        provides, can be passed in. In that case the actions for a grid
+        position are looked up rather than worked out from the walls.
+        """
+        if legal_actions is not None:
+            actions = legal_actions.get(config.position)
+
+            if actions is not None:
+                return list(actions)
+
         possible = []
         x, y = config.position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -42,7 +90,18 @@ class Actions:
         return possible
 
     @staticmethod
-    def get_legal_neighbors(position, walls):
+    def get_legal_neighbors(position, walls, legal_neighbors=None):
+        """
+        Returns the positions next to a position that are not walls. As
+        with get_possible_actions, a table of the legal neighbors for each
+        grid position can be passed in to look these up.
+        """
+        if legal_neighbors is not None:
+            neighbors = legal_neighbors.get(position)
+
+            if neighbors is not None:
+                return list(neighbors)
+
         x, y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
         neighbors = []
@@ -63,48 +122,68 @@ class Actions:
 
         return neighbors
 
+    @staticmethod
+    def get_possible_actions_mask(config, walls, legal_action_masks=None):
+        """
+        Returns the actions possible from a configuration as a bit mask of
+        direction codes. A table of the masks for each grid position, such
+        as the one a Layout provides, can be passed in to look these up.
+        """
+        if legal_action_masks is not None:
+            mask = legal_action_masks.get(config.position)
+
+            if mask is not None:
+                return mask
+
+        return Actions.actions_to_mask(Actions.get_possible_actions(config, walls))
+
+    @staticmethod
+    def actions_to_mask(actions):
+        mask = 0
+
+        for action in actions:
+            mask |= 1 << Actions.direction_to_code[action]
+
+        return mask
+
+    @staticmethod
+    def mask_to_actions(mask):
+        return list(Actions.mask_to_directions[mask])
+
     @staticmethod
     def get_successor(position, action):
-        dx, dy = Actions.direction_to_vector(action)
+        dx, dy = Actions.code_to_vector[Actions.direction_to_code[action]]
         x, y = position
 
         return x + dx, y + dy
 
     @staticmethod
     def direction_to_vector(direction, speed=1.0):
-        dx, dy = Actions.directions[direction]
+        dx, dy = Actions.code_to_vector[Actions.direction_to_code[direction]]
         return dx * speed, dy * speed
 
+    # Indexed by the sign of dx plus one and then the sign of dy plus one.
+    sign_to_direction = [
+        [Direction.SOUTH, Direction.WEST, Direction.NORTH],
+        [Direction.SOUTH, Direction.STOP, Direction.NORTH],
+        [Direction.SOUTH, Direction.EAST, Direction.NORTH]
+    ]
+
     @staticmethod
     def vector_to_direction(vector):
+        """
+        Only the signs of the parts of the vector matter. These are turned
+        into an index into a table of directions. Movement north or south
+        takes precedence over movement east or west.
+        """
         dx, dy = vector
-
-        if dy > 0:
-            return Direction.NORTH
-
-        if dy < 0:
-            return Direction.SOUTH
-
-        if dx > 0:
-            return Direction.EAST
-
-        if dx < 0:
-            return Direction.WEST
-
-        return Direction.STOP
+        return Actions.sign_to_direction[(dx > 0) - (dx < 0) + 1][(dy > 0) - (dy < 0) + 1]
 
     @staticmethod
     def reverse_direction(action):
-        if action == Direction.NORTH:
-            return Direction.SOUTH
-
-        if action == Direction.SOUTH:
-            return Direction.NORTH
-
-        if action == Direction.EAST:
-            return Direction.WEST
+        code = Actions.direction_to_code.get(action)
 
-        if action == Direction.WEST:
-            return Direction.EAST
+        if code is None:
+            return action
 
-        return action
+        return Actions.code_to_direction[Actions.code_to_reverse[code]]
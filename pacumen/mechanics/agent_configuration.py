@@ -3,6 +3,16 @@ from pacumen.mechanics.agent_direction import Direction
 
 
 class Configuration:
+    """
+    A configuration is the position and direction of an agent. One is made
+    for every move of every agent, so configurations use slots rather than
+    a dictionary of attributes. A configuration is never changed once it
+    has been made, since it may be shared by many states; a move makes a
+    new configuration instead. This is what allows the hash to be worked
+    out once and then kept.
+    """
+    __slots__ = ('position', 'direction', '_hash')
+
     def generate_successor(self, vector):
         x, y = self.position
         dx, dy = vector
@@ -28,15 +38,31 @@ class Configuration:
     def __init__(self, position, direction):
         self.position = position
         self.direction = direction
+        self._hash = None
 
     def __str__(self):
         return "(x,y)=" + str(self.position) + ", " + str(self.direction)
 
     def __hash__(self):
-        x = hash(self.position)
-        y = hash(self.direction)
+        # The direction is hashed by its code rather than by its name. The
+        # hash of a string changes from one run to the next, while the code
+        # doesn't, so the hash is the same in every process.
+        if self._hash is None:
+            x = hash(self.position)
+            y = Actions.direction_to_code.get(self.direction, len(Actions.code_to_direction))
+
+            self._hash = hash(x + 13 * y)
+
+        return self._hash
+
+    def __getstate__(self):
+        # The kept hash is left out, so it is always worked out again by
+        # the process that unpickles the configuration.
+        return self.position, self.direction
 
-        return hash(x + 13 * y)
+    def __setstate__(self, state):
+        self.position, self.direction = state
+        self._hash = None
 
     def __eq__(self, other):
         if other is None:
@@ -1,4 +1,11 @@
 class AgentState:
+    """
+    An agent state is copied for each agent that moves in every successor
+    state, so agent states use slots rather than a dictionary of
+    attributes. The hash makes use of the hash kept by the configuration.
+    """
+    __slots__ = ('configuration', 'start', 'is_pacumen', 'scared_timer')
+
     def get_position(self):
         if self.configuration is None:
             return None
@@ -11,9 +18,23 @@ class AgentState:
 
         return self.configuration.get_direction()
 
+    def freeze(self):
+        """
+        Makes the agent state read-only. This is done once a state has
+        been generated, since its agent states are then shared with its
+        successors. The class of the agent state is simply swapped, so an
+        agent state that can still be changed pays nothing for this.
+        """
+        self.__class__ = FrozenAgentState
+
     def copy(self):
-        state = AgentState(self.start, self.is_pacumen)
+        """
+        Returns a copy that can be changed, even of a frozen agent state.
+        """
+        state = AgentState.__new__(AgentState)
         state.configuration = self.configuration
+        state.start = self.start
+        state.is_pacumen = self.is_pacumen
         state.scared_timer = self.scared_timer
         return state
 
@@ -30,10 +51,37 @@ class AgentState:
             return "Ghost: " + str(self.configuration)
 
     def __hash__(self):
-        return hash(hash(self.configuration) + 13 * hash(self.scared_timer))
+        # An agent that has no configuration is hashed as zero, rather than
+        # by the hash of None, which may change from one run to the next.
+        if self.configuration is None:
+            configuration_hash = 0
+        else:
+            configuration_hash = hash(self.configuration)
+
+        return hash(configuration_hash + 13 * hash(self.scared_timer))
 
     def __eq__(self, other):
         if other is None:
             return False
 
         return self.configuration == other.configuration and self.scared_timer == other.scared_timer
+
+
+class FrozenAgentState(AgentState):
+    """
+    An agent state that has been frozen. Any attempt to change it raises
+    an exception; a copy of it can be changed instead.
+    """
+    __slots__ = ()
+
+    def freeze(self):
+        pass
+
+    def __setattr__(self, name, value):
+        raise Exception("This agent state is read-only. Make a copy of it in order to change it.")
+
+    def __setstate__(self, state):
+        _, slots = state
+
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
@@ -0,0 +1,329 @@
+from pacumen.mechanics.environment import Environment
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.agent_direction import Direction
+from pacumen.mechanics.game_state import GameState
+from pacumen.rules.pacumen_rules import PacumenRules
+from pacumen.rules.ghost_rules import GhostRules
+
+try:
+    import numpy as np
+except ImportError:
+    raise Exception("NumPy not installed.")
+
+
+class BatchEnvironment(Environment):
+    """
+    Plays a batch of independent games of the same layout in lockstep. The
+    state of every game is held in NumPy arrays, with one row per game, and
+    the rules of PacumenRules and GhostRules are applied to all the rows at
+    once. This avoids creating a GameState, and its agent states, for every
+    ply of every game, which is where most of the time goes when thousands
+    of episodes are played one at a time for learning.
+
+    The action passed to do_action or step is an array with one action for
+    Pacumen in each game. A step is Pacumen's move followed by a move of
+    each ghost, with the reward being the change in score over all of
+    those moves. The ghosts choose uniformly among their legal actions, as
+    a RandomGhost does. A subclass can change how they choose by providing
+    its own choose_ghost_actions.
+
+    Scared ghosts move at half speed, so positions are held in half steps:
+    a position of (x, y) is stored as (2 * x, 2 * y). Grid positions are
+    those where both parts are even. Positions that are not walls are
+    given an index, in the same order as MazeDistances uses, and the dots
+    and pellets of each game are arrays of booleans over those indexes.
+    """
+    STOP = Actions.direction_to_code[Direction.STOP]
+
+    def get_current_state(self):
+        """
+        Returns the arrays holding the state of the games. These are the
+        arrays of the environment itself, not copies, so they change as
+        the games are played.
+        """
+        return {
+            'positions': self.positions,
+            'directions': self.directions,
+            'scared_timers': self.scared_timers,
+            'dots': self.dots,
+            'pellets': self.pellets,
+            'num_dots': self.num_dots,
+            'scores': self.scores,
+            'wins': self.wins,
+            'losses': self.losses
+        }
+
+    def get_possible_actions(self, _state=None):
+        """
+        Returns, for each game, Pacumen's possible actions as a bit mask of
+        direction codes. A game that is over has a mask of zero.
+        """
+        masks = self.get_action_masks(0)
+        masks[self.wins | self.losses] = 0
+        return masks
+
+    def is_terminal(self):
+        return self.wins | self.losses
+
+    def reset(self):
+        self.reset_games(np.ones(self.batch_size, dtype=bool))
+        return self.get_current_state()
+
+    def reset_games(self, games):
+        """
+        Returns the games selected by a boolean array to the start state of
+        the layout, leaving the other games as they are.
+        """
+        self.positions[games] = self.start_positions
+        self.directions[games] = BatchEnvironment.STOP
+        self.scared_timers[games] = 0
+        self.dots[games] = self.start_dots
+        self.pellets[games] = self.start_pellets
+        self.num_dots[games] = self.start_dots.sum()
+        self.scores[games] = 0
+        self.wins[games] = False
+        self.losses[games] = False
+
+    def do_action(self, actions):
+        """
+        Plays one step of every game that is not over. Returns the rewards
+        for each game along with the state of the games. The games that
+        are over are left as they are, with a reward of zero.
+        """
+        codes = self.get_action_codes(actions)
+        rewards = np.zeros(self.batch_size, dtype=np.int64)
+
+        playing = ~(self.wins | self.losses)
+        known = (codes >= 0) & (codes < len(Actions.code_to_direction))
+        legal = known & (((self.get_action_masks(0) >> np.where(known, codes, 0)) & 1) == 1)
+
+        if not legal[playing].all():
+            raise Exception("Illegal action attempted.")
+
+        self.move_pacumen(codes, playing, rewards)
+
+        for ghost in range(1, self.num_agents):
+            playing &= ~(self.wins | self.losses)
+
+            if not playing.any():
+                break
+
+            ghost_codes = self.choose_ghost_actions(ghost, self.get_ghost_action_masks(ghost))
+            self.move_ghost(ghost, ghost_codes, playing, rewards)
+
+        return rewards, self.get_current_state()
+
+    def step(self, actions):
+        """
+        Plays one step of every game, as do_action does, and then starts a
+        new game in place of each game that ended. Returns the state of the
+        games, the rewards and which games ended in this step.
+        """
+        rewards, _ = self.do_action(actions)
+        done = self.wins | self.losses
+
+        self.reset_games(done)
+
+        return self.get_current_state(), rewards, done
+
+    def choose_ghost_actions(self, _ghost, masks):
+        """
+        Returns, for each game, the direction code of a legal action chosen
+        at random for the ghost. A ghost with no legal actions stops.
+        """
+        counts = self.mask_counts[masks]
+        choices = (self.random.random_sample(self.batch_size) * counts).astype(np.int64)
+        return self.mask_codes[masks, choices]
+
+    def get_action_masks(self, agent):
+        """
+        Returns, for each game, the actions possible for an agent as a bit
+        mask. In between grid positions the agent must continue straight,
+        as with Actions.get_possible_actions.
+        """
+        positions = self.positions[:, agent]
+        on_grid = ((positions[:, 0] | positions[:, 1]) & 1) == 0
+
+        cells = self.cell_index[positions[:, 0] >> 1, positions[:, 1] >> 1]
+        straight = np.left_shift(1, self.directions[:, agent]).astype(np.uint8)
+
+        return np.where(on_grid, self.legal_masks[cells], straight)
+
+    def get_ghost_action_masks(self, ghost):
+        """
+        Applies the rules of GhostRules.get_legal_actions to the possible
+        actions: ghosts can't stop and only turn back at a dead end.
+        """
+        masks = self.get_action_masks(ghost) & ~np.uint8(Actions.STOP_BIT)
+        reverse = np.left_shift(1, self.reverse_codes[self.directions[:, ghost]]).astype(np.uint8)
+
+        turning_back = ((masks & reverse) != 0) & (masks != reverse)
+        masks[turning_back] &= ~reverse[turning_back]
+
+        return masks
+
+    def move_pacumen(self, codes, playing, rewards):
+        moved = np.where(playing, codes, BatchEnvironment.STOP)
+        self.positions[:, 0] += self.vectors[moved] * self.pacumen_speed
+
+        turned = moved != BatchEnvironment.STOP
+        self.directions[turned, 0] = moved[turned]
+
+        # Pacumen only ever moves from one grid position to the next, so
+        # after moving he is always on the position he consumes.
+        games = np.flatnonzero(playing)
+        cells = self.cell_index[self.positions[games, 0, 0] >> 1, self.positions[games, 0, 1] >> 1]
+
+        ate_dot = self.dots[games, cells]
+        dot_games = games[ate_dot]
+        self.dots[dot_games, cells[ate_dot]] = False
+        self.num_dots[dot_games] -= 1
+        rewards[dot_games] += 10
+
+        won = dot_games[(self.num_dots[dot_games] == 0) & ~self.losses[dot_games]]
+        rewards[won] += 500
+        self.wins[won] = True
+
+        ate_pellet = self.pellets[games, cells]
+        pellet_games = games[ate_pellet]
+        self.pellets[pellet_games, cells[ate_pellet]] = False
+        self.scared_timers[pellet_games, 1:] = PacumenRules.SCARED_TIME
+
+        rewards[games] -= GameState.TIME_PENALTY
+
+        for ghost in range(1, self.num_agents):
+            self.collide(ghost, playing, rewards)
+
+        self.scores[games] += rewards[games]
+
+    def move_ghost(self, ghost, codes, playing, rewards):
+        games = np.flatnonzero(playing)
+        codes = codes[games]
+
+        speeds = np.where(self.scared_timers[games, ghost] > 0, self.ghost_speed // 2, self.ghost_speed)
+        self.positions[games, ghost] += self.vectors[codes] * speeds[:, None]
+
+        turned = codes != BatchEnvironment.STOP
+        self.directions[games[turned], ghost] = codes[turned]
+
+        # A ghost that stops being scared is moved to the nearest grid
+        # position. Half steps are rounded up, as nearest_point does.
+        timers = self.scared_timers[games, ghost]
+        snapping = games[timers == 1]
+        self.positions[snapping, ghost] += self.positions[snapping, ghost] & 1
+        self.scared_timers[games, ghost] = np.maximum(0, timers - 1)
+
+        change = np.zeros(self.batch_size, dtype=np.int64)
+        self.collide(ghost, playing, change)
+
+        rewards[games] += change[games]
+        self.scores[games] += change[games]
+
+    def collide(self, ghost, playing, rewards):
+        """
+        Applies the rules of GhostRules.collide to each game in which the
+        ghost is close enough to Pacumen to eat him.
+        """
+        distances = np.abs(self.positions[:, ghost] - self.positions[:, 0]).sum(axis=1)
+        touching = playing & (distances <= self.collision_distance)
+
+        if not touching.any():
+            return
+
+        scared = touching & (self.scared_timers[:, ghost] > 0)
+        rewards[scared] += 200
+        self.positions[scared, ghost] = self.start_positions[ghost]
+        self.directions[scared, ghost] = BatchEnvironment.STOP
+        self.scared_timers[scared, ghost] = 0
+
+        eaten = touching & ~scared & ~self.wins
+        rewards[eaten] -= 500
+        self.losses[eaten] = True
+
+    def get_action_codes(self, actions):
+        """
+        Accepts the actions as direction codes or as directions and returns
+        them as an array of direction codes.
+        """
+        actions = np.asarray(actions)
+
+        if actions.shape != (self.batch_size,):
+            raise Exception("Expected one action for each of the %d games." % self.batch_size)
+
+        if actions.dtype.kind in 'iu':
+            return actions.astype(np.int64)
+
+        return np.array([Actions.direction_to_code[action] for action in actions], dtype=np.int64)
+
+    def __init__(self, layout, batch_size, num_ghost_agents=1000, seed=None):
+        if batch_size < 1:
+            raise Exception("A batch must hold at least one game.")
+
+        self.layout = layout
+        self.batch_size = batch_size
+        self.random = np.random.RandomState(seed)
+
+        self.cells = sorted(layout.legal_neighbors.keys())
+        self.cell_index = np.full((layout.width, layout.height), -1, dtype=np.int64)
+
+        for index, (x, y) in enumerate(self.cells):
+            self.cell_index[x, y] = index
+
+        self.legal_masks = np.array([layout.legal_action_masks[cell] for cell in self.cells], dtype=np.uint8)
+        self.vectors = np.array(Actions.code_to_vector, dtype=np.int64)
+        self.reverse_codes = np.array(Actions.code_to_reverse, dtype=np.int64)
+
+        # For each bit mask of direction codes, the codes it holds, in
+        # order, and how many there are. Choosing an action at random is
+        # then a lookup at a random index below the count.
+        self.mask_codes = np.full((len(Actions.mask_to_directions), len(Actions.code_to_direction)),
+                                  BatchEnvironment.STOP, dtype=np.int64)
+        self.mask_counts = np.ones(len(Actions.mask_to_directions), dtype=np.int64)
+
+        for mask, directions in enumerate(Actions.mask_to_directions):
+            for choice, direction in enumerate(directions):
+                self.mask_codes[mask, choice] = Actions.direction_to_code[direction]
+
+            self.mask_counts[mask] = max(1, len(directions))
+
+        # Speeds and distances in half steps.
+        self.pacumen_speed = int(2 * PacumenRules.PACUMEN_SPEED)
+        self.ghost_speed = int(2 * GhostRules.GHOST_SPEED)
+        self.collision_distance = int(2 * GhostRules.COLLISION_TOLERANCE)
+
+        # The agents are chosen from the layout as GameStateData does.
+        start_positions = []
+        number_of_ghosts = 0
+
+        for is_pacumen, position in layout.agent_positions:
+            if not is_pacumen:
+                if number_of_ghosts == num_ghost_agents:
+                    continue
+                else:
+                    number_of_ghosts += 1
+
+            start_positions.append((2 * position[0], 2 * position[1]))
+
+        self.num_agents = len(start_positions)
+        self.start_positions = np.array(start_positions, dtype=np.int64)
+
+        self.start_dots = np.zeros(len(self.cells), dtype=bool)
+        self.start_pellets = np.zeros(len(self.cells), dtype=bool)
+
+        for x, y in layout.dots.as_list():
+            self.start_dots[self.cell_index[x, y]] = True
+
+        for x, y in layout.pellets:
+            self.start_pellets[self.cell_index[x, y]] = True
+
+        self.positions = np.zeros((batch_size, self.num_agents, 2), dtype=np.int64)
+        self.directions = np.zeros((batch_size, self.num_agents), dtype=np.int64)
+        self.scared_timers = np.zeros((batch_size, self.num_agents), dtype=np.int64)
+        self.dots = np.zeros((batch_size, len(self.cells)), dtype=bool)
+        self.pellets = np.zeros((batch_size, len(self.cells)), dtype=bool)
+        self.num_dots = np.zeros(batch_size, dtype=np.int64)
+        self.scores = np.zeros(batch_size, dtype=np.int64)
+        self.wins = np.zeros(batch_size, dtype=bool)
+        self.losses = np.zeros(batch_size, dtype=bool)
+
+        self.reset()
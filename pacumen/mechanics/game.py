@@ -6,6 +6,10 @@ class Game:
     PREVIOUS_STDOUT = None
     PREVIOUS_STDERR = None
 
+    # The methods an agent may optionally provide to be told about the
+    # game as it goes.
+    AGENT_HOOKS = ['process_initial_state', 'observation_function', 'terminal_state']
+
     def run(self):
         """
         This is the core logic of the entire program. Here is where the game
@@ -13,6 +17,7 @@ class Game:
         has been established with an initial set of game state data.
         """
         self.display.initialize(self.state.data)
+        self.resolve_agent_hooks()
 
         # Inform learning agents of the game start. This allows for the call
         # for processing the initial state.
@@ -27,31 +32,36 @@ class Game:
                 self._agent_crash(index, quiet=True)
                 return
 
-            if 'process_initial_state' in dir(agent):
+            process_initial_state = self.agent_hooks[index]['process_initial_state']
+
+            if process_initial_state is not None:
                 self.mute_output(index)
 
-                agent.process_initial_state(self.state.deep_copy())
+                process_initial_state(self.observe(index))
 
                 self.unmute_output()
 
         agent_index = self.starting_agent
         number_of_agents = len(self.agents)
 
+        observation_functions = [hooks['observation_function'] for hooks in self.agent_hooks]
+        get_actions = [agent.get_action for agent in self.agents]
+
         while not self.game_over:
             # Agents will be iterated through so that each has a "turn"
             # during game play.
-            agent = self.agents[agent_index]
+            observation_function = observation_functions[agent_index]
 
             # Get an observation of the environment state.
 
-            if 'observation_function' in dir(agent):
+            if observation_function is not None:
                 self.mute_output(agent_index)
 
-                observation = agent.observation_function(self.state.deep_copy())
+                observation = observation_function(self.observe(agent_index))
 
                 self.unmute_output()
             else:
-                observation = self.state.deep_copy()
+                observation = self.observe(agent_index)
 
             # Each agent will get an action based on the current observation.
             # That action will be appended to the move history which allows a
@@ -60,7 +70,7 @@ class Game:
 
             self.mute_output(agent_index)
 
-            action = agent.get_action(observation)
+            action = get_actions[agent_index](observation)
 
             self.unmute_output()
 
@@ -98,12 +108,14 @@ class Game:
         # Inform a learning agent of the game result. This is allowing
         # the agent to deal with terminal states in some way.
 
-        for agent_index, agent in enumerate(self.agents):
-            if "terminal_state" in dir(agent):
+        for agent_index, hooks in enumerate(self.agent_hooks):
+            terminal_state = hooks['terminal_state']
+
+            if terminal_state is not None:
                 try:
                     self.mute_output(agent_index)
 
-                    agent.terminal_state(self.state)
+                    terminal_state(self.observe(agent_index))
 
                     self.unmute_output()
                 except RuntimeError:
@@ -113,6 +125,34 @@ class Game:
 
         self.display.finish()
 
+    def resolve_agent_hooks(self):
+        """
+        Works out, once for the whole game, which of the optional methods
+        each agent provides. The result is a table with, for each agent,
+        the bound method for each hook or None if the agent doesn't have
+        it. The game loop calls the methods straight from this table
+        instead of searching the attributes of the agent on every turn.
+        """
+        self.agent_hooks = []
+        self.copy_observations = []
+
+        for agent in self.agents:
+            self.agent_hooks.append(dict((hook, getattr(agent, hook, None)) for hook in Game.AGENT_HOOKS))
+            self.copy_observations.append(getattr(agent, 'copy_observations', False))
+
+    def observe(self, agent_index):
+        """
+        Provides the observation of the environment state for an agent.
+        Agents are given a read-only view of the current state, which
+        shares everything with the state except a short list of its agent
+        states, rather than a copy of it. Only an agent that asks for
+        copies, because it changes its observations, is given a deep copy.
+        """
+        if self.copy_observations[agent_index]:
+            return self.state.deep_copy()
+
+        return self.state.get_view()
+
     def get_progress(self):
         if self.game_over:
             return 1.0
@@ -159,6 +199,8 @@ class Game:
         self.agent_crashed = False
         self.mute_agents = mute_agents
         self.number_of_moves = None
+        self.agent_hooks = []
+        self.copy_observations = []
 
         from io import StringIO
         self.agent_output = [StringIO() for _ in agents]
@@ -36,11 +36,15 @@ class GameState:
         # of the current game state.
         state = GameState(self)
 
+        # The successor shares the agent states of this state. Only the
+        # agent that is moving gets its own copy of its agent state.
+        state.data.copy_agent_state(agent_index)
+
         # Successor states are generated by agent action. Each agent's
         # specific logic will deal with the effects of its action in
         # the environment.
         if agent_index == 0:
-            state.data.eaten = [False for _ in range(state.get_num_agents())]
+            state.data.eaten = (False,) * state.get_num_agents()
             PacumenRules.apply_action(state, action)
         else:
             GhostRules.apply_action(state, action, agent_index)
@@ -58,6 +62,7 @@ class GameState:
 
         state.data.set_agent_who_moved(agent_index)
         state.data.score += state.data.score_change
+        state.data.update_hash()
 
         return state
 
@@ -80,19 +85,19 @@ class GameState:
         return self.get_legal_actions(ghost_index)
 
     def get_ghost_states(self):
-        return self.data.agent_states[1:]
+        return [s.copy() for s in self.data.agent_states[1:]]
 
     def get_ghost_state(self, agent_index):
         if agent_index == 0 or agent_index >= self.get_num_agents():
             raise Exception("Invalid index passed to the get_ghost_state call in GameState.")
 
-        return self.data.agent_states[agent_index]
+        return self.data.agent_states[agent_index].copy()
 
     def get_ghost_positions(self):
-        return [s.get_position() for s in self.get_ghost_states()]
+        return [s.get_position() for s in self.data.agent_states[1:]]
 
     def get_ghost_directions(self):
-        return [s.get_direction() for s in self.get_ghost_states()]
+        return [s.get_direction() for s in self.data.agent_states[1:]]
 
     def get_ghost_position(self, agent_index):
         if agent_index == 0:
@@ -116,13 +121,13 @@ class GameState:
         return self.data.dots
 
     def get_num_dots(self):
-        return self.data.dots.count()
+        return self.data.get_num_dots()
 
     def get_pellets(self):
-        return self.data.pellets
+        return self.data.pellets.as_list()
 
     def get_num_pellets(self):
-        return len(self.data.pellets)
+        return self.data.pellets.count()
 
     def get_num_agents(self):
         return len(self.data.agent_states)
@@ -143,12 +148,15 @@ class GameState:
         return self.data.layout.walls[x][y]
 
     def has_pellet(self, x, y):
-        position = x, y
-        for value in self.data.pellets:
-            if value == position:
-                return True
-            else:
-                return False
+        return self.data.pellets[x][y]
+
+    def get_view(self):
+        """
+        Returns a read-only view of the state. See GameStateData.get_view.
+        """
+        state = GameState.__new__(GameState)
+        state.data = self.data.get_view()
+        return state
 
     def deep_copy(self):
         state = GameState(self)
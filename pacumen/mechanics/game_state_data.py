@@ -2,17 +2,47 @@ from pacumen.mechanics.grid import Grid
 from pacumen.mechanics.agent_state import AgentState
 from pacumen.mechanics.agent_direction import Direction
 from pacumen.mechanics.agent_configuration import Configuration
+from pacumen.library.zobrist import ZobristTable
 from pacumen.library.utilities import nearest_point
 
 
 class GameStateData:
-    def initialize(self, layout, num_ghost_agents):
-        # TODO: Why a copy?
-        # It seems that layout.dots and layout.dots.copy will be
-        # providing the same thing. So why bother with a copy?
-        self.dots = layout.dots.copy()
+    ZOBRIST = ZobristTable()
+
+    # Used to spread the score over the bits of the hash.
+    SCORE_MULTIPLIER = 0x9E3779B97F4A7C15
+    HASH_MASK = (1 << ZobristTable.BITS) - 1
+
+    # These are the defaults for every state. A successor only sets the
+    # ones that its move actually changes, so there is no need to reset
+    # all of them each time a successor is generated.
+    _lose = False
+    _win = False
+    _agent_moved = None
+    _dot_eaten_location = None
+    _pellet_eaten_location = None
+    _changed_agents = None
+    _zobrist = 0
+    _detached = False
+    score_change = 0
 
-        self.pellets = layout.pellets[:]
+    def initialize(self, layout, num_ghost_agents):
+        # The dots of the layout are read-only, so they can be shared. The
+        # dots of the game are only ever changed by replacing the grid.
+        self.dots = layout.dots
+        self.num_dots = self.dots.count()
+
+        # The pellets are held in a read-only grid, in the same way as the
+        # dots. Looking up a pellet is a single bit test, and eating one
+        # replaces the grid with a changed copy, which is a single integer
+        # operation, so the grid can be shared by successor states. The
+        # pellets are listed in the order of the grid.
+        self.pellets = Grid(layout.width, layout.height)
+
+        for x, y in layout.pellets:
+            self.pellets[x][y] = True
+
+        self.pellets.freeze()
         self.layout = layout
         self.agent_states = []
         self.score = 0
@@ -28,9 +58,12 @@ class GameStateData:
                 else:
                     number_of_ghosts += 1
 
-            self.agent_states.append(AgentState(Configuration(position, Direction.STOP), is_pacumen))
+            agent_state = AgentState(Configuration(position, Direction.STOP), is_pacumen)
+            agent_state.freeze()
+            self.agent_states.append(agent_state)
 
-        self.eaten = [False for _ in self.agent_states]
+        self.eaten = (False,) * len(self.agent_states)
+        self._zobrist = self.compute_zobrist()
 
     def is_a_win(self):
         self._win = True
@@ -62,10 +95,161 @@ class GameStateData:
     def check_for_loss(self):
         return self._lose
 
+    def get_num_dots(self):
+        if self._detached:
+            return self.dots.count()
+
+        return self.num_dots
+
+    def remove_dot(self, position):
+        x, y = position
+
+        # Removing a dot that isn't there would throw the count and the
+        # hash out of step with the grid.
+        if not self.dots[x][y]:
+            return
+
+        self.dots = self.dots.copy_with(x, y, False)
+        self.num_dots -= 1
+        self._zobrist ^= self.ZOBRIST.get_key('dot', x, y)
+
+    def remove_pellet(self, position):
+        x, y = position
+
+        if not self.pellets[x][y]:
+            return
+
+        self.pellets = self.pellets.copy_with(x, y, False)
+        self._zobrist ^= self.ZOBRIST.get_key('pellet', x, y)
+
+    def agent_key(self, index):
+        """
+        Returns the Zobrist key for the agent state at the index. This is
+        made up of the position and direction of the agent along with its
+        scared timer.
+        """
+        agent_state = self.agent_states[index]
+        configuration = agent_state.configuration
+
+        if configuration is None:
+            key = self.ZOBRIST.get_key('agent', index, None, None)
+        else:
+            key = self.ZOBRIST.get_key('agent', index, configuration.position, configuration.direction)
+
+        return key ^ self.ZOBRIST.get_key('scared', index, agent_state.scared_timer)
+
+    def copy_agent_state(self, index):
+        """
+        Successor states share the agent states of the state they came
+        from. Any agent state that is going to be changed must first be
+        replaced with a copy of its own, which this method does. The copy
+        is returned so that it can be changed.
+
+        The key of the agent is taken out of the hash here. It is put back
+        in, with whatever changes were made, by update_hash().
+        """
+        if self._changed_agents is None:
+            self._changed_agents = []
+        elif index in self._changed_agents:
+            return self.agent_states[index]
+
+        self._zobrist ^= self.agent_key(index)
+        self._changed_agents.append(index)
+
+        agent_state = self.agent_states[index].copy()
+        self.agent_states[index] = agent_state
+        return agent_state
+
+    def update_hash(self):
+        """
+        Puts the keys of any agents changed since the last update back
+        into the hash. Only the changed agents are looked at, so this is
+        the same amount of work no matter how large the state is.
+        """
+        if self._changed_agents is None:
+            return
+
+        for index in self._changed_agents:
+            self._zobrist ^= self.agent_key(index)
+            self.agent_states[index].freeze()
+
+        self._changed_agents = None
+
+    def compute_zobrist(self):
+        """
+        Works out the Zobrist key of the agents, dots and pellets from
+        scratch, rather than keeping it up to date.
+        """
+        zobrist = 0
+
+        for x, y in self.dots.as_list():
+            zobrist ^= self.ZOBRIST.get_key('dot', x, y)
+
+        for x, y in self.pellets.as_list():
+            zobrist ^= self.ZOBRIST.get_key('pellet', x, y)
+
+        for index in range(len(self.agent_states)):
+            zobrist ^= self.agent_key(index)
+
+        return zobrist
+
+    def get_zobrist_key(self):
+        """
+        Returns the Zobrist key of the agents, dots and pellets. Unlike the
+        hash, the score is left out, which makes this a compact key for
+        the position of the game.
+        """
+        if self._detached:
+            return self.compute_zobrist()
+
+        return self._zobrist
+
+    def get_view(self):
+        """
+        Returns a read-only view of the state, which is what agents are
+        given to observe. The dots, the pellets, the agent states and the
+        list of eaten ghosts of a generated state are all read-only and
+        are shared with the view. Only the list of agent states is the
+        view's own, so that nothing done to the view can reach the state.
+        A view of a deep copy is made from read-only copies of its parts.
+        """
+        view = GameStateData.__new__(GameStateData)
+        view.__dict__.update(self.__dict__)
+        view.agent_states = self.agent_states[:]
+
+        if self._detached:
+            view.dots = self.dots.copy()
+            view.dots.freeze()
+            view.pellets = self.pellets.copy()
+            view.pellets.freeze()
+            view.agent_states = self.copy_agent_states(self.agent_states)
+
+            for agent_state in view.agent_states:
+                agent_state.freeze()
+
+            view.eaten = tuple(self.eaten)
+            view.num_dots = view.dots.count()
+            view._zobrist = view.compute_zobrist()
+            view._detached = False
+
+        return view
+
     def deep_copy(self):
+        """
+        Returns a copy of the state that can be changed freely. Its dots
+        and pellets are grids that can be written to and its agent states
+        are copies of its own. Since any of those can be changed, the
+        copy doesn't keep a running count of the dots or a running hash;
+        both are worked out again when they are asked for. A successor
+        of the copy starts from a read-only view of it, so keeps them
+        running again.
+        """
         state = GameStateData(self)
-        state.dots = self.dots.deep_copy()
-        state.layout = self.layout.deep_copy()
+        state.dots = self.dots.copy()
+        state.pellets = self.pellets.copy()
+        state.agent_states = self.copy_agent_states(self.agent_states)
+        state.eaten = list(self.eaten)
+        state._detached = True
         state._agent_moved = self._agent_moved
         state._dot_eaten_location = self._dot_eaten_location
         state._pellet_eaten_location = self._pellet_eaten_location
@@ -108,30 +292,31 @@ class GameStateData:
 
     def __init__(self, previous_state=None):
         if previous_state is not None:
+            if previous_state._detached:
+                previous_state = previous_state.get_view()
+
             self.layout = previous_state.layout
-            self.dots = previous_state.dots.shallow_copy()
-            self.pellets = previous_state.pellets[:]
-            self.agent_states = self.copy_agent_states(previous_state.agent_states)
+            # The dots are shared with the previous state. The rules never
+            # change a dot grid in place; eating a dot replaces the grid
+            # of the successor with a changed copy.
+            self.dots = previous_state.dots
+            self.num_dots = previous_state.num_dots
+            # Everything else is shared as well. The rules replace any
+            # of these that a move changes rather than changing them in
+            # place. Only the list of agent states is new, so that the
+            # agent states which do change can be swapped for copies.
+            self.pellets = previous_state.pellets
+            self.agent_states = previous_state.agent_states[:]
             self.score = previous_state.score
             self.eaten = previous_state.eaten
-
-        self._lose = False
-        self._win = False
-        self._agent_moved = None
-        self._dot_eaten_location = None
-        self._pellet_eaten_location = None
-        self.score_change = 0
+            self._zobrist = previous_state._zobrist
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
-        grid_map = Grid(width, height)
-
-        for x in range(width):
-            for y in range(height):
-                dots, walls = self.dots, self.layout.walls
-                grid_map[x][y] = self.walls_and_dots(dots[x][y], walls[x][y])
+        dots, walls = self.dots, self.layout.walls
+        grid_map = [[self.walls_and_dots(dots[x][y], walls[x][y]) for y in range(height)] for x in range(width)]
 
-        for x, y in self.pellets:
+        for x, y in self.pellets.as_list():
             grid_map[x][y] = 'o'
 
         for agent_state in self.agent_states:
@@ -149,26 +334,28 @@ class GameStateData:
             else:
                 grid_map[x][y] = self.ghost_display()
 
-        return str(grid_map) + ("\nScore: %d\n" % self.score)
+        out = [''.join([grid_map[x][y] for x in range(width)]) for y in range(height)]
+        out.reverse()
+
+        return '\n'.join(out) + ("\nScore: %d\n" % self.score)
 
     def __hash__(self):
-        # Get a hash of each agent state. This is just to determine if any of
-        # the states cannot be hashed.
-        for i, agent_state in enumerate(self.agent_states):
-            try:
-                int(hash(agent_state))
-            except TypeError as e:
-                print(e)
-
-        return int((hash(tuple(self.agent_states)) + 13 *
-                    hash(self.dots) + 113 *
-                    hash(tuple(self.pellets)) + 7 *
-                    hash(self.score)) % 1048575)
+        """
+        The hash is a 64-bit Zobrist hash. The keys of the agents, dots
+        and pellets are kept up to date as successors are generated, so
+        only the score has to be folded in here.
+        """
+        return self.get_zobrist_key() ^ ((int(self.score) * self.SCORE_MULTIPLIER) & self.HASH_MASK)
 
     def __eq__(self, other):
         if other is None:
             return False
 
+        # States with different keys can't be equal, which saves comparing
+        # their parts one by one.
+        if not self.get_zobrist_key() == other.get_zobrist_key():
+            return False
+
         if not self.agent_states == other.agent_states:
             return False
 
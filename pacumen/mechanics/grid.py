@@ -1,20 +1,69 @@
+import weakref
+
+
+class GridColumn(tuple):
+    """
+    A single column of a grid, as a tuple of booleans. This is what allows
+    the grid[x][y] style of access even though the grid itself stores all
+    of its cells as bits of a single integer. Reading a cell of a column
+    is a plain tuple lookup, so it costs no more than reading from a list.
+
+    The grid keeps each column it builds until the column changes. A
+    column only holds a weak reference to its grid, so the two don't keep
+    each other alive. Writing a cell through a column writes the cell of
+    the grid, which then builds a new column for x. The column that was
+    written through keeps the values it was built with.
+    """
+    def __setitem__(self, y, value):
+        grid = self.grid_reference()
+
+        if grid is None:
+            raise Exception("The grid of this column no longer exists.")
+
+        grid.set_cell(self.x, y, value)
+
+
 class Grid:
+    """
+    A grid of boolean values, such as the walls or the dots of a layout.
+    All cells are stored as the bits of a single arbitrary-precision
+    integer, with the cell at (x, y) being bit x * height + y. This means
+    that counting is a popcount, hashing and equality work on the whole
+    integer at once, and copies can share the integer since it is
+    immutable.
+
+    A grid can be frozen, which makes it read-only. This is done for grids
+    that are shared, such as the walls of a layout or the dots of a game
+    state. Copies of a frozen grid can be changed.
+
+    As with a list of lists, negative indexes count back from the end and
+    an index out of range raises an IndexError. Any value can be written
+    to a cell, but only its truth is kept, as True or False.
+    """
     def as_list(self, key=True):
         """
         Returns a list of grid positions from the current grid, based on
-        the key value.
+        the key value. The positions are in order of x and then y. Only
+        the cells that match are visited, one set bit at a time, so a
+        sparse grid, such as the pellets of a game, is listed quickly.
         """
         grid_list = []
+        bits = self.data if key else ~self.data & ((1 << (self.width * self.height)) - 1)
 
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key:
-                    grid_list.append((x, y))
+        while bits:
+            low_bit = bits & -bits
+            grid_list.append(divmod(low_bit.bit_length() - 1, self.height))
+            bits ^= low_bit
 
         return grid_list
 
     def count(self, item=True):
-        return sum([x.count(item) for x in self.data])
+        total = bin(self.data).count('1')
+
+        if item:
+            return total
+
+        return self.width * self.height - total
 
     def copy(self):
         """
@@ -23,21 +72,64 @@ class Grid:
             FFFF
             FTFF
 
-        Would return this:
+        Would return a new grid holding the same cells. Since the cells
+        are held as an immutable integer, the copy simply refers to the
+        same integer. Any change made to either grid afterwards replaces
+        the integer of that grid only.
+        """
+        g = Grid.__new__(Grid)
+        g.width = self.width
+        g.height = self.height
+        g.data = self.data
+        g.frozen = False
+        g._columns = [None] * g.width
+        return g
+
+    def set_cell(self, x, y, value):
+        if self.frozen:
+            raise Exception("This grid is read-only. Make a copy of it in order to change it.")
+
+        x = range(self.width)[x]
+        bit = 1 << (x * self.height + range(self.height)[y])
+
+        if value:
+            self.data |= bit
+        else:
+            self.data &= ~bit
+
+        self._columns[x] = None
+
+    def make_column(self, x):
+        column = self.data >> (x * self.height)
+        cells = GridColumn([(column >> y) & 1 == 1 for y in range(self.height)])
+        cells.grid_reference = weakref.ref(self)
+        cells.x = x
 
-            [[False, False, False, False], [False, True, False, False]]
+        return cells
+
+    def copy_with(self, x, y, value):
+        """
+        Returns a copy of the grid with the cell at (x, y) set to the
+        provided value. The grid itself is left unchanged, which means
+        any state still referring to it is unaffected. Only the changed
+        cell is paid for, rather than building and then changing a full
+        copy of the grid.
         """
-        g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+        bit = 1 << (range(self.width)[x] * self.height + range(self.height)[y])
+
+        g = self.copy()
+        g.data = (self.data | bit) if value else (self.data & ~bit)
+        g.frozen = self.frozen
         return g
 
+    def freeze(self):
+        self.frozen = True
+
     def deep_copy(self):
         return self.copy()
 
     def shallow_copy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        return self.copy()
 
     def __init__(self, width, height, initial_value=False):
         if initial_value not in [False, True]:
@@ -46,49 +138,64 @@ class Grid:
         self.width = width
         self.height = height
 
-        self.data = [[initial_value for _ in range(height)] for _ in range(width)]
+        if initial_value:
+            self.data = (1 << (width * height)) - 1
+        else:
+            self.data = 0
+
+        self.frozen = False
+        self._columns = [None] * self.width
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
 
-    def __getitem__(self, item):
-        return self.data[item]
+    def __getitem__(self, x):
+        column = self._columns[x]
+
+        if column is None:
+            column = self._columns[x] = self.make_column(range(self.width)[x])
+
+        return column
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield self[x]
+
+    def __len__(self):
+        return self.width
+
+    def __getstate__(self):
+        return self.width, self.height, self.data, self.frozen
+
+    def __setstate__(self, state):
+        self.width, self.height, self.data, self.frozen = state
+        self._columns = [None] * self.width
 
     def __hash__(self):
         """
-        The hash for a grid will be given in powers of 2. That value will
-        then be added to a hash_value being stored for each element of
-        the grid that is marked True. For example, consider the following
-        grid of dots
+        The hash for a grid will be given in powers of 2. Each element of
+        the grid that is marked True contributes its power of 2, which is
+        exactly how the cells are stored. For example, consider the
+        following grid of dots
 
         FFFFFFFFFF
         FTTFFFFFFF
         FFFFFFFFFF
 
-        Here there are two True elements, so those would be given hash_value
-        and base values accordingly:
+        Here there are two True elements, so those would be given these
+        values for their positions:
 
-        True 0 16
-        True 16 128
+        True 16
+        True 128
 
-        The hash for that grid would then be the addition of both: 144.
+        The hash for that grid would then be the hash of both: 144.
         """
-        base = 1
-        hash_value = 0
-
-        for row in self.data:
-            for element in row:
-                if element:
-                    hash_value += base
-
-                base *= 2
-
-        return hash(hash_value)
+        return hash(self.data)
 
     def __eq__(self, other):
         if other is None:
             return False
 
-        return self.data == other.data
+        return self.data == other.data and self.width == other.width and self.height == other.height
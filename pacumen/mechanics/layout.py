@@ -3,6 +3,7 @@ import random
 import logging
 
 from pacumen.mechanics.grid import Grid
+from pacumen.mechanics.agent_action import Actions
 from pacumen.library.utilities import manhattan_distance
 
 
@@ -57,6 +58,58 @@ class Layout:
             self.agent_positions.append((int(character), (x, y)))
             self.num_ghosts += 1
 
+    def process_legal_moves(self):
+        """
+        The walls never change, so the legal actions and the legal
+        neighbors of every position that is not a wall are worked out
+        once, here, rather than on every move. The legal actions are kept
+        both as tuples of directions and as bit masks of direction codes.
+        Positions off the edge of the layout are treated as walls.
+        """
+        for x in range(self.width):
+            for y in range(self.height):
+                if self.walls[x][y]:
+                    continue
+
+                actions = []
+
+                for direction, (dx, dy) in Actions.directions_as_list:
+                    next_x, next_y = x + dx, y + dy
+
+                    if not (0 <= next_x < self.width and 0 <= next_y < self.height):
+                        continue
+
+                    if not self.walls[next_x][next_y]:
+                        actions.append(direction)
+
+                self.legal_actions[(x, y)] = tuple(actions)
+                self.legal_action_masks[(x, y)] = Actions.actions_to_mask(actions)
+                self.legal_neighbors[(x, y)] = tuple(Actions.get_legal_neighbors((x, y), self.walls))
+
+    def get_legal_actions(self, position):
+        return list(self.legal_actions.get(position, ()))
+
+    def get_legal_neighbors(self, position):
+        return list(self.legal_neighbors.get(position, ()))
+
+    def get_maze_distances(self):
+        """
+        Provides the maze distances between all positions of the layout.
+        These are only worked out the first time they are asked for and
+        are then kept for as long as the layout is.
+        """
+        if self.maze_distances is None:
+            from pacumen.mechanics.maze_distances import MazeDistances
+            self.maze_distances = MazeDistances(self)
+
+        return self.maze_distances
+
+    def get_maze_distance(self, start, goal):
+        return self.get_maze_distances().get_distance(start, goal)
+
+    def get_maze_path(self, start, goal):
+        return self.get_maze_distances().get_path(start, goal)
+
     def is_wall(self, position):
         row, column = position
         return self.walls[row][column]
@@ -95,13 +148,28 @@ class Layout:
         self.pellets = []
         self.agent_positions = []
         self.num_ghosts = 0
+        self.legal_actions = {}
+        self.legal_action_masks = {}
+        self.legal_neighbors = {}
+        self.maze_distances = None
         self.process_layout_text(layout_text)
+        self.process_legal_moves()
+        self.walls.freeze()
+        self.dots.freeze()
         self.total_dots = len(self.dots.as_list())
         self.total_pellets = len(self.pellets)
 
     def __str__(self):
         return "\n".join(self.layout_text)
 
+    def __getstate__(self):
+        # The maze distances may be mapped in from the cache, which can't
+        # be pickled. They are simply worked out or loaded again when they
+        # are next needed.
+        state = self.__dict__.copy()
+        state['maze_distances'] = None
+        return state
+
 
 def load_layout(fullname):
     if not os.path.exists(fullname):
@@ -187,3 +255,9 @@ def test():
     print("Get a random corner: {}".format(game_layout.get_random_corner()))
     print("----------------")
     print("Get furthest corner (from Pacumen): {}".format(game_layout.get_furthest_corner(pacumen)))
+    print("----------------")
+    print("Legal actions (from Pacumen): {}".format(game_layout.get_legal_actions(pacumen)))
+    print("Legal neighbors (from Pacumen): {}".format(game_layout.get_legal_neighbors(pacumen)))
+    print("----------------")
+    print("Maze distance (Pacumen to First Ghost): {}".format(game_layout.get_maze_distance(pacumen, ghost_1)))
+    print("Maze path (Pacumen to First Ghost): {}".format(game_layout.get_maze_path(pacumen, ghost_1)))
@@ -0,0 +1,214 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import logging
+from array import array
+
+from pacumen.library.utilities import nearest_point
+
+# The distances of each layout are kept in this directory, so that they
+# only ever have to be worked out once. The files are named by a hash of
+# the layout text and are mapped into memory when read, which means any
+# number of processes using the same layout share a single copy of the
+# distances. Setting this to None, or setting the PACUMEN_CACHE_DIRECTORY
+# environment variable to an empty value, turns the cache off.
+CACHE_DIRECTORY = os.environ.get("PACUMEN_CACHE_DIRECTORY",
+                                 os.path.join(os.path.expanduser("~"), ".cache", "pacumen")) or None
+
+
+class MazeDistances:
+    """
+    Provides the true maze distance between any two positions of a layout
+    that are not walls. Unlike the Manhattan distance, the maze distance
+    takes the walls into account: it is the number of moves on a shortest
+    path between the two positions.
+
+    The distances for all pairs of positions are worked out at once, with
+    a breadth-first search from every position, and are kept in a single
+    compact array. Each position that is not a wall is given an index and
+    the distance from the position with index i to the position with
+    index j is held at i * count + j, where count is the number of
+    positions.
+    """
+    UNREACHABLE = 0xFFFF
+
+    # Each cache file starts with a header: a marker, the array typecode,
+    # the byte order, the size of each item and the number of positions.
+    CACHE_MARKER = b'PMDC'
+    CACHE_HEADER = struct.Struct('<4sccHQ')
+
+    def compute(self):
+        count = len(self.cells)
+        distances = array(self.typecode, [self.unreachable]) * (count * count)
+
+        for source in range(count):
+            row = source * count
+            distances[row + source] = 0
+
+            frontier = [source]
+            distance = 0
+
+            while frontier:
+                distance += 1
+                next_frontier = []
+
+                for cell in frontier:
+                    for neighbor in self.neighbors[cell]:
+                        if distances[row + neighbor] == self.unreachable:
+                            distances[row + neighbor] = distance
+                            next_frontier.append(neighbor)
+
+                frontier = next_frontier
+
+        return distances
+
+    def get_cache_path(self):
+        text = "\n".join(self.layout_text).encode("utf-8")
+        return os.path.join(CACHE_DIRECTORY, hashlib.sha256(text).hexdigest() + ".distances")
+
+    def load(self):
+        """
+        Returns the distances from the cache, mapped into memory, or None
+        if they are not in the cache or were stored in a form that this
+        machine can't use.
+        """
+        if CACHE_DIRECTORY is None:
+            return None
+
+        path = self.get_cache_path()
+
+        try:
+            with open(path, "rb") as cache_file:
+                mapped = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        expected_header = self.get_cache_header()
+        expected_size = self.CACHE_HEADER.size + len(self.cells) ** 2 * expected_header[3]
+
+        if len(mapped) != expected_size or self.CACHE_HEADER.unpack_from(mapped) != expected_header:
+            logging.debug("Ignoring cached distances in {}".format(path))
+            mapped.close()
+            return None
+
+        return memoryview(mapped)[self.CACHE_HEADER.size:].cast(self.typecode)
+
+    def save(self, distances):
+        """
+        Writes the distances to the cache. The file is written under a
+        temporary name and then renamed, so other processes never see a
+        partly written file. A cache that can't be written to is skipped.
+        """
+        if CACHE_DIRECTORY is None:
+            return
+
+        path = self.get_cache_path()
+        temporary_path = "{}.{}.tmp".format(path, os.getpid())
+
+        try:
+            os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+
+            try:
+                with open(temporary_path, "wb") as cache_file:
+                    cache_file.write(self.CACHE_HEADER.pack(*self.get_cache_header()))
+                    cache_file.write(distances.tobytes())
+
+                os.replace(temporary_path, path)
+            finally:
+                # Once renamed the temporary file is gone. If anything
+                # failed before then, it is removed rather than left in
+                # the cache.
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+        except OSError as error:
+            logging.debug("Unable to cache distances in {}: {}".format(path, error))
+
+    def get_cache_header(self):
+        byte_order = b'<' if sys.byteorder == "little" else b'>'
+        item_size = array(self.typecode).itemsize
+        return self.CACHE_MARKER, self.typecode.encode("ascii"), byte_order, item_size, len(self.cells)
+
+    def get_index(self, position):
+        """
+        Returns the index of the grid position nearest to the provided
+        position. Agents between grid positions are treated as being at
+        the nearest one.
+        """
+        index = self.index.get(position)
+
+        if index is None:
+            index = self.index.get(nearest_point(position))
+
+            if index is None:
+                raise Exception("The position " + str(position) + " is not a legal position.")
+
+        return index
+
+    def get_distance(self, start, goal):
+        """
+        Returns the maze distance between two positions. If there is no
+        path between them, infinity is returned.
+        """
+        distance = self.distances[self.get_index(start) * len(self.cells) + self.get_index(goal)]
+
+        if distance == self.unreachable:
+            return float('inf')
+
+        return distance
+
+    def get_path(self, start, goal):
+        """
+        Returns a shortest path from the start to the goal as a list of
+        positions, including both of them. The path is built a step at a
+        time by moving to any neighbor that is one step closer to the goal,
+        so nothing other than the distances needs to be stored. If there
+        is no path, None is returned.
+        """
+        count = len(self.cells)
+        current = self.get_index(start)
+        goal_index = self.get_index(goal)
+        goal_row = goal_index * count
+
+        remaining = self.distances[goal_row + current]
+
+        if remaining == self.unreachable:
+            return None
+
+        path = [self.cells[current]]
+
+        while current != goal_index:
+            remaining -= 1
+
+            for neighbor in self.neighbors[current]:
+                if self.distances[goal_row + neighbor] == remaining:
+                    current = neighbor
+                    break
+
+            path.append(self.cells[current])
+
+        return path
+
+    def __init__(self, layout):
+        self.layout_text = layout.layout_text
+        self.cells = sorted(layout.legal_neighbors.keys())
+        self.index = dict((cell, index) for index, cell in enumerate(self.cells))
+
+        self.neighbors = [[self.index[neighbor] for neighbor in layout.legal_neighbors[cell] if neighbor != cell]
+                          for cell in self.cells]
+
+        # The distances are held as unsigned shorts. Only a layout with
+        # more open positions than that can hold needs anything larger.
+        if len(self.cells) < MazeDistances.UNREACHABLE:
+            self.typecode = 'H'
+            self.unreachable = MazeDistances.UNREACHABLE
+        else:
+            self.typecode = 'L'
+            self.unreachable = 0xFFFFFFFF
+
+        self.distances = self.load()
+
+        if self.distances is None:
+            self.distances = self.compute()
+            self.save(self.distances)
@@ -0,0 +1,401 @@
+import time
+
+from pacumen.mechanics.structures import PriorityQueue
+
+try:
+    import numpy as np
+except ImportError:
+    raise Exception("NumPy not installed.")
+
+
+class MDPSolver:
+    """
+    Solves a MarkovDecisionProcess, working out the value of every state
+    and the best action to take from it.
+
+    The process is only asked about its states, actions, transitions and
+    rewards once, when the solver is created. Each state is given an
+    integer index and each (state, action) pair an index of its own, with
+    the pairs of a state next to each other. Every transition is then held
+    as an entry of a few parallel arrays: the pair it belongs to, the index
+    of the next state, its probability and its reward. Together these make
+    up a sparse transition matrix, so a Bellman backup of all the states
+    is a handful of array operations rather than a loop over dictionaries.
+
+    A state with no possible actions is terminal and has a value of zero.
+    Next states that get_states didn't list are added as they are found.
+
+    Besides the synchronous methods, where every state is backed up from
+    the values of the previous iteration, there are asynchronous methods
+    that back up one state at a time, in place. These spend less work on
+    states whose values have already settled. Every method counts the
+    backups it carries out and how long it took, which get_statistics
+    reports.
+    """
+    def value_iteration(self, tolerance=1e-6, iterations=1000):
+        """
+        Backs up the values of all states together until no value changes
+        by more than the tolerance, or until the number of iterations is
+        reached. Returns the number of iterations carried out.
+        """
+        self.start_run()
+
+        while self.iterations < iterations:
+            values = self.maximize(self.compute_q_values(self.values))
+            change = np.max(np.abs(values - self.values)) if len(values) else 0.0
+
+            self.values = values
+            self.iterations += 1
+            self.backups += len(self.acting_states)
+
+            if change <= tolerance:
+                self.converged = True
+                break
+
+        self.policy = self.greedy_policy(self.compute_q_values(self.values))
+        self.finish_run()
+
+        return self.iterations
+
+    def asynchronous_value_iteration(self, tolerance=1e-6, iterations=1000):
+        """
+        Sweeps over the states in order, backing up each state in place,
+        so that a backup already uses the new values of the states before
+        it in the sweep. This is Gauss-Seidel value iteration. It stops
+        when no value in a sweep changes by more than the tolerance, or
+        when the number of sweeps reaches the number of iterations.
+        Returns the number of sweeps carried out.
+        """
+        self.start_run()
+
+        successors = self.get_successors()
+        values = self.values.tolist()
+
+        while self.iterations < iterations:
+            change = 0.0
+
+            for state in self.acting_states.tolist():
+                value = self.backup(state, values, successors)
+                change = max(change, abs(value - values[state]))
+                values[state] = value
+
+            self.iterations += 1
+            self.backups += len(self.acting_states)
+
+            if change <= tolerance:
+                self.converged = True
+                break
+
+        self.values = np.array(values, dtype=np.float64)
+        self.policy = self.greedy_policy(self.compute_q_values(self.values))
+        self.finish_run()
+
+        return self.iterations
+
+    def prioritized_sweeping(self, tolerance=1e-6, max_backups=1000000):
+        """
+        Backs up states one at a time, always choosing the state whose
+        value is furthest from its Bellman backup. When a state is backed
+        up, only the states that can lead to it, its predecessors, need
+        their errors worked out again. States are kept in a priority queue
+        by the negative of their error, so the largest error comes first,
+        and a state is only queued if its error is above the tolerance.
+        This stops when the queue is empty or after the number of backups
+        reaches max_backups. Returns the number of backups carried out.
+        """
+        self.start_run()
+
+        successors = self.get_successors()
+        predecessors = self.get_predecessors()
+        values = self.values.tolist()
+        queue = PriorityQueue()
+
+        for state in self.acting_states.tolist():
+            error = abs(values[state] - self.backup(state, values, successors))
+
+            if error > tolerance:
+                queue.push(state, -error)
+
+        while not queue.is_empty() and self.backups < max_backups:
+            state = queue.pop()
+            values[state] = self.backup(state, values, successors)
+            self.backups += 1
+
+            for predecessor in predecessors[state]:
+                error = abs(values[predecessor] - self.backup(predecessor, values, successors))
+
+                if error > tolerance:
+                    queue.update(predecessor, -error)
+
+        self.converged = queue.is_empty()
+        self.iterations = self.backups
+
+        self.values = np.array(values, dtype=np.float64)
+        self.policy = self.greedy_policy(self.compute_q_values(self.values))
+        self.finish_run()
+
+        return self.backups
+
+    def backup(self, state, values, successors):
+        """
+        Returns the Bellman backup of a single state, the largest of its
+        Q-values, with respect to the provided list of values.
+        """
+        discount = self.discount
+
+        return max(sum(probability * (reward + discount * values[next_state])
+                       for next_state, probability, reward in transitions)
+                   for transitions in successors[state])
+
+    def get_successors(self):
+        """
+        Returns, for each state, a list with an entry for each of its
+        actions, and for each action the list of its transitions as
+        (next state, probability, reward) triples. Backing up one state
+        at a time is faster with these lists than with array operations.
+        """
+        if self.successors is None:
+            transitions = [[] for _ in self.pairs]
+
+            for pair, next_state, probability, reward in zip(self.transition_pairs.tolist(),
+                                                             self.next_states.tolist(),
+                                                             self.probabilities.tolist(),
+                                                             self.rewards.tolist()):
+                transitions[pair].append((next_state, probability, reward))
+
+            self.successors = [[] for _ in self.states]
+
+            for pair, state in enumerate(self.pair_states.tolist()):
+                self.successors[state].append(transitions[pair])
+
+        return self.successors
+
+    def get_predecessors(self):
+        """
+        Returns, for each state, the states with an action that can lead
+        to it. A state that can lead back to itself is one of its own
+        predecessors, since backing it up changes its own error.
+        """
+        if self.predecessors is None:
+            predecessors = [set() for _ in self.states]
+            sources = self.pair_states[self.transition_pairs]
+
+            for source, next_state, probability in zip(sources.tolist(),
+                                                       self.next_states.tolist(),
+                                                       self.probabilities.tolist()):
+                if probability > 0:
+                    predecessors[next_state].add(source)
+
+            self.predecessors = [sorted(states) for states in predecessors]
+
+        return self.predecessors
+
+    def policy_iteration(self, tolerance=1e-6, iterations=1000):
+        """
+        Alternates between working out the values of the current policy
+        and making the policy greedy with respect to those values. This
+        stops when the policy no longer changes, or when the number of
+        improvements reaches the number of iterations. Each evaluation of
+        a policy is carried out to the tolerance, and is also limited to
+        the number of iterations. Returns the number of improvements.
+        """
+        self.start_run()
+
+        policy = self.pair_starts.copy()
+
+        while self.iterations < iterations:
+            self.evaluate_policy(policy, tolerance, iterations)
+
+            q_values = self.compute_q_values(self.values)
+            improved = self.greedy_policy(q_values)
+
+            # An action is only replaced by one that is strictly better,
+            # so that a policy with ties doesn't change forever.
+            keep = q_values[policy] >= q_values[improved]
+            improved[keep] = policy[keep]
+
+            self.iterations += 1
+
+            if np.array_equal(improved, policy):
+                self.converged = True
+                break
+
+            policy = improved
+
+        self.policy = policy
+        self.finish_run()
+
+        return self.iterations
+
+    def evaluate_policy(self, policy, tolerance, iterations):
+        """
+        Works out the values of following the policy, given as the index
+        of the pair chosen for each state that has actions.
+        """
+        for _ in range(iterations):
+            values = np.zeros(len(self.states))
+            values[self.acting_states] = self.compute_q_values(self.values)[policy]
+            self.backups += len(self.acting_states)
+
+            change = np.max(np.abs(values - self.values)) if len(values) else 0.0
+            self.values = values
+
+            if change <= tolerance:
+                break
+
+    def compute_q_values(self, values):
+        """
+        Returns the Q-value of every (state, action) pair with respect to
+        the provided state values.
+        """
+        targets = self.probabilities * (self.rewards + self.discount * values[self.next_states])
+        return np.bincount(self.transition_pairs, weights=targets, minlength=len(self.pairs))
+
+    def maximize(self, q_values):
+        values = np.zeros(len(self.states))
+
+        if len(self.pairs):
+            values[self.acting_states] = np.maximum.reduceat(q_values, self.pair_starts)
+
+        return values
+
+    def greedy_policy(self, q_values):
+        """
+        Returns the index of the best pair for each state that has actions.
+        When actions tie, the first of them is chosen.
+        """
+        if not len(self.pairs):
+            return np.zeros(0, dtype=np.int64)
+
+        best = np.repeat(np.maximum.reduceat(q_values, self.pair_starts), self.pair_counts)
+        candidates = np.flatnonzero(q_values >= best)
+        _, first = np.unique(self.pair_states[candidates], return_index=True)
+
+        return candidates[first]
+
+    def start_run(self):
+        self.iterations = 0
+        self.backups = 0
+        self.converged = False
+        self.started = time.time()
+
+    def finish_run(self):
+        self.elapsed = time.time() - self.started
+
+        # The Q-values are worked out once for the final values, so that
+        # reading them is only a lookup.
+        self.q_values = self.compute_q_values(self.values)
+
+    def get_backups_per_second(self):
+        if self.elapsed == 0:
+            return 0.0
+
+        return self.backups / self.elapsed
+
+    def get_statistics(self):
+        return {
+            'states': len(self.states),
+            'iterations': self.iterations,
+            'backups': self.backups,
+            'converged': self.converged,
+            'seconds': self.elapsed,
+            'backups_per_second': self.get_backups_per_second()
+        }
+
+    def get_value(self, state):
+        return float(self.values[self.index[state]])
+
+    def get_q_value(self, state, action):
+        pair = self.pair_index[(state, action)]
+        return float(self.q_values[pair])
+
+    def get_policy(self, state):
+        """
+        Returns the best action from the state, or None if the state has
+        no actions.
+        """
+        position = self.policy_position[self.index[state]]
+
+        if position < 0:
+            return None
+
+        return self.pairs[self.policy[position]][1]
+
+    def get_values(self):
+        return dict((state, float(value)) for state, value in zip(self.states, self.values))
+
+    def get_state_index(self, state):
+        index = self.index.get(state)
+
+        if index is None:
+            index = len(self.states)
+            self.index[state] = index
+            self.states.append(state)
+
+        return index
+
+    def __init__(self, mdp, discount=0.9):
+        self.mdp = mdp
+        self.discount = discount
+
+        self.states = []
+        self.index = {}
+
+        for state in mdp.get_states():
+            self.get_state_index(state)
+
+        self.pairs = []
+        self.pair_index = {}
+        pair_states = []
+
+        transition_pairs = []
+        next_states = []
+        probabilities = []
+        rewards = []
+
+        # The list of states grows as unlisted next states are found, so
+        # it is walked by index.
+        index = 0
+
+        while index < len(self.states):
+            state = self.states[index]
+
+            for action in mdp.get_possible_actions(state):
+                pair = len(self.pairs)
+                self.pairs.append((state, action))
+                self.pair_index[(state, action)] = pair
+                pair_states.append(index)
+
+                for next_state, probability in mdp.get_transition_states_and_probs(state, action):
+                    transition_pairs.append(pair)
+                    next_states.append(self.get_state_index(next_state))
+                    probabilities.append(probability)
+                    rewards.append(mdp.get_reward(state, action, next_state))
+
+            index += 1
+
+        self.pair_states = np.array(pair_states, dtype=np.int64)
+        self.acting_states, self.pair_starts, self.pair_counts = np.unique(
+            self.pair_states, return_index=True, return_counts=True)
+
+        self.transition_pairs = np.array(transition_pairs, dtype=np.int64)
+        self.next_states = np.array(next_states, dtype=np.int64)
+        self.probabilities = np.array(probabilities, dtype=np.float64)
+        self.rewards = np.array(rewards, dtype=np.float64)
+
+        # For each state, the position in the policy of its chosen pair,
+        # or -1 for a state with no actions.
+        self.policy_position = np.full(len(self.states), -1, dtype=np.int64)
+        self.policy_position[self.acting_states] = np.arange(len(self.acting_states))
+
+        self.values = np.zeros(len(self.states))
+        self.q_values = self.compute_q_values(self.values)
+        self.policy = self.pair_starts.copy()
+        self.successors = None
+        self.predecessors = None
+
+        self.iterations = 0
+        self.backups = 0
+        self.converged = False
+        self.started = 0.0
+        self.elapsed = 0.0
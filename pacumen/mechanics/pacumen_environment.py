@@ -0,0 +1,136 @@
+from pacumen.mechanics.environment import Environment
+from pacumen.mechanics.game_state import GameState
+from pacumen.library.utilities import nearest_point
+
+try:
+    import numpy as np
+except ImportError:
+    raise Exception("NumPy not installed.")
+
+
+class PacumenEnvironment(Environment):
+    """
+    Provides the game itself as an environment for a learning agent that
+    controls Pacumen. Each action is a move of Pacumen, after which each
+    of the ghost agents moves in turn. The reward for an action is the
+    change in score over all of those moves.
+
+    The environment is also observed as a stack of feature planes, one for
+    each kind of thing on the board, with a plane being indexed by x and
+    then y. The planes for agents count the agents at each grid position;
+    a scared ghost in between grid positions is counted at the nearest one.
+
+    The planes are allocated once. After each action only the positions
+    that changed are updated, in place, so the observation returned is
+    always the same array. A caller that wants to keep an observation has
+    to copy it.
+    """
+    WALLS = 0
+    DOTS = 1
+    PELLETS = 2
+    GHOSTS = 3
+    SCARED_GHOSTS = 4
+    PACUMEN = 5
+
+    NUM_PLANES = 6
+
+    def get_current_state(self):
+        return self.state
+
+    def get_possible_actions(self, state):
+        return state.get_legal_actions(0)
+
+    def get_observation(self):
+        return self.planes
+
+    def reset(self):
+        self.state = GameState()
+        self.state.initialize(self.layout, len(self.ghost_agents))
+
+        self.planes[:] = 0
+        self.planes[PacumenEnvironment.WALLS] = self.walls
+
+        for x, y in self.state.get_dots().as_list():
+            self.planes[PacumenEnvironment.DOTS, x, y] = 1
+
+        for x, y in self.state.get_pellets():
+            self.planes[PacumenEnvironment.PELLETS, x, y] = 1
+
+        self.agent_cells = []
+
+        for index in range(self.state.get_num_agents()):
+            cell = self.get_agent_cell(index)
+            self.planes[cell] += 1
+            self.agent_cells.append(cell)
+
+        return self.planes
+
+    def do_action(self, action):
+        """
+        Moves Pacumen and then each ghost. Returns the reward along with
+        the observation of the resulting state.
+        """
+        start_score = self.state.data.score
+
+        self.state = self.state.generate_successor(0, action)
+        self.update_consumed(self.state.data)
+
+        for index in range(1, self.state.get_num_agents()):
+            if self.state.is_win() or self.state.is_loss():
+                break
+
+            ghost_action = self.ghost_agents[index - 1].get_action(self.state)
+            self.state = self.state.generate_successor(index, ghost_action)
+
+        self.update_agents()
+
+        return self.state.data.score - start_score, self.planes
+
+    def update_consumed(self, data):
+        dot = data.get_dot_eaten_location()
+
+        if dot is not None:
+            self.planes[(PacumenEnvironment.DOTS,) + dot] = 0
+
+        pellet = data.get_pellet_eaten_location()
+
+        if pellet is not None:
+            self.planes[(PacumenEnvironment.PELLETS,) + pellet] = 0
+
+    def update_agents(self):
+        for index, previous in enumerate(self.agent_cells):
+            cell = self.get_agent_cell(index)
+
+            if cell != previous:
+                self.planes[previous] -= 1
+                self.planes[cell] += 1
+                self.agent_cells[index] = cell
+
+    def get_agent_cell(self, index):
+        """
+        Returns the plane and the grid position an agent is counted at.
+        """
+        agent_state = self.state.data.agent_states[index]
+        x, y = nearest_point(agent_state.get_position())
+
+        if index == 0:
+            plane = PacumenEnvironment.PACUMEN
+        elif agent_state.scared_timer > 0:
+            plane = PacumenEnvironment.SCARED_GHOSTS
+        else:
+            plane = PacumenEnvironment.GHOSTS
+
+        return plane, x, y
+
+    def __init__(self, layout, ghost_agents, dtype=np.float32):
+        self.layout = layout
+        self.ghost_agents = ghost_agents[:layout.get_ghost_count()]
+
+        self.walls = np.array([[layout.walls[x][y] for y in range(layout.height)]
+                               for x in range(layout.width)], dtype=dtype)
+        self.planes = np.zeros((PacumenEnvironment.NUM_PLANES, layout.width, layout.height), dtype=dtype)
+
+        self.state = None
+        self.agent_cells = []
+
+        self.reset()
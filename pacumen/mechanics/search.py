@@ -0,0 +1,402 @@
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.structures import NodeArena, Stack, Queue, PriorityQueue
+from pacumen.library.utilities import manhattan_distance
+
+
+class SearchResult:
+    """
+    Holds the outcome of a search: the actions that reach a goal, or None
+    if no goal could be reached, along with the cost of those actions, the
+    number of states that were expanded and the number of successors that
+    were generated.
+    """
+    def __init__(self, actions, cost, expanded, generated):
+        self.actions = actions
+        self.cost = cost
+        self.expanded = expanded
+        self.generated = generated
+
+    def __repr__(self):
+        return "({0},{1},{2},{3})".format(self.actions, self.cost, self.expanded, self.generated)
+
+
+def null_heuristic(_state, _problem=None):
+    """
+    A heuristic that estimates the cost from any state to the nearest goal
+    as 0. With this heuristic, A* search is uniform cost search.
+    """
+    return 0
+
+
+def manhattan_heuristic(state, problem):
+    """
+    Estimates the cost to the goal of a PositionSearchProblem, or of any
+    problem with a goal position, as the Manhattan distance to it.
+    """
+    return manhattan_distance(state, problem.goal)
+
+
+def depth_first_search(problem):
+    return uninformed_search(problem, Stack(), revisit=True)
+
+
+def breadth_first_search(problem):
+    return uninformed_search(problem, Queue(), revisit=False)
+
+
+def uniform_cost_search(problem):
+    return best_first_search(problem, lambda state, cost: cost)
+
+
+def a_star_search(problem, heuristic=null_heuristic):
+    return best_first_search(problem, lambda state, cost: cost + heuristic(state, problem))
+
+
+def greedy_search(problem, heuristic=null_heuristic):
+    return best_first_search(problem, lambda state, cost: heuristic(state, problem))
+
+
+def uninformed_search(problem, frontier, revisit):
+    """
+    Searches with a frontier that decides the order of nodes by itself,
+    such as a stack or a queue. The nodes are kept in a NodeArena, so the
+    frontier only holds node indexes and the path is only built when a
+    goal is found. States are closed when they are expanded.
+
+    With revisit, a state is pushed again, as a new node, each time it is
+    reached from another state, until it is expanded. This is what
+    depth-first search needs, so that the deepest way of reaching a state
+    is the one it is expanded from. Without revisit, a state is only ever
+    pushed the first time it is reached. Either way one set of states is
+    enough: the states that are expanded with revisit, or the states that
+    are reached without it.
+    """
+    nodes = NodeArena()
+    start = problem.get_start_state()
+    seen = set() if revisit else {start}
+    expanded = 0
+    generated = 0
+
+    frontier.push(nodes.add(start))
+
+    while not frontier.is_empty():
+        node = frontier.pop()
+        state = nodes.get_state(node)
+
+        if revisit:
+            if state in seen:
+                continue
+
+            seen.add(state)
+
+        if problem.is_goal_state(state):
+            return SearchResult(nodes.get_path(node), nodes.get_cost(node), expanded, generated)
+
+        expanded += 1
+        cost = nodes.get_cost(node)
+
+        for successor, action, step_cost in problem.get_successors(state):
+            generated += 1
+
+            if successor in seen:
+                continue
+
+            if not revisit:
+                seen.add(successor)
+
+            frontier.push(nodes.add(successor, node, action, cost + step_cost))
+
+    return SearchResult(None, None, expanded, generated)
+
+
+def best_first_search(problem, priority):
+    """
+    Searches in order of a priority worked out from each state and the
+    cost of the cheapest known path to it. Each reached state has one node
+    in a NodeArena. When a cheaper path to a state on the frontier is
+    found, its node is given the new parent and its priority on the
+    frontier is lowered.
+    """
+    nodes = NodeArena()
+    start = problem.get_start_state()
+    reached = {start: nodes.add(start)}
+    closed = set()
+    expanded = 0
+    generated = 0
+
+    frontier = PriorityQueue()
+    frontier.push(start, priority(start, 0))
+
+    while not frontier.is_empty():
+        state = frontier.pop()
+        node = reached[state]
+
+        if problem.is_goal_state(state):
+            return SearchResult(nodes.get_path(node), nodes.get_cost(node), expanded, generated)
+
+        closed.add(state)
+        expanded += 1
+        cost = nodes.get_cost(node)
+
+        for successor, action, step_cost in problem.get_successors(state):
+            generated += 1
+
+            if successor in closed:
+                continue
+
+            successor_cost = cost + step_cost
+            successor_node = reached.get(successor)
+
+            if successor_node is None:
+                reached[successor] = nodes.add(successor, node, action, successor_cost)
+            elif successor_cost < nodes.get_cost(successor_node):
+                nodes.relink(successor_node, node, action, successor_cost)
+            else:
+                continue
+
+            frontier.update(successor, priority(successor, successor_cost))
+
+    return SearchResult(None, None, expanded, generated)
+
+
+def bidirectional_search(problem):
+    """
+    Searches breadth first from the start and, at the same time, backward
+    from the goal, always growing whichever side has the smaller layer of
+    states. The path is found once the two sides meet, which on open
+    layouts is after far fewer expansions than a search from one side.
+
+    The problem must have a single goal state, held as problem.goal, and
+    must provide get_predecessors, which returns (predecessor, action,
+    cost) triples for a state, as a PositionSearchProblem does. Every
+    action is taken to have the same cost, so the path found is the one
+    with the fewest actions.
+    """
+    start = problem.get_start_state()
+    goal = problem.goal
+
+    if problem.is_goal_state(start):
+        return SearchResult([], 0, 0, 0)
+
+    forward = NodeArena()
+    backward = NodeArena()
+    forward_reached = {start: forward.add(start)}
+    backward_reached = {goal: backward.add(goal)}
+    forward_layer = [start]
+    backward_layer = [goal]
+    expanded = 0
+    generated = 0
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            nodes, reached, other_nodes, other_reached = forward, forward_reached, backward, backward_reached
+            get_successors = problem.get_successors
+            layer = forward_layer
+        else:
+            nodes, reached, other_nodes, other_reached = backward, backward_reached, forward, forward_reached
+            get_successors = problem.get_predecessors
+            layer = backward_layer
+
+        next_layer = []
+        meeting = None
+        meeting_length = None
+
+        # The whole layer is expanded before stopping, since the first
+        # meeting found is not always on a shortest path.
+        for state in layer:
+            node = reached[state]
+            length = nodes.get_cost(node) + 1
+            expanded += 1
+
+            for successor, action, _ in get_successors(state):
+                generated += 1
+
+                if successor in reached:
+                    continue
+
+                reached[successor] = nodes.add(successor, node, action, length)
+                next_layer.append(successor)
+
+                other_node = other_reached.get(successor)
+
+                if other_node is not None:
+                    total = length + other_nodes.get_cost(other_node)
+
+                    if meeting_length is None or total < meeting_length:
+                        meeting, meeting_length = successor, total
+
+        if meeting is not None:
+            # The backward search stores each action as the move toward
+            # the goal, so its path from the goal is just reversed.
+            actions = forward.get_path(forward_reached[meeting])
+            actions.extend(reversed(backward.get_path(backward_reached[meeting])))
+
+            return SearchResult(actions, meeting_length, expanded, generated)
+
+        if layer is forward_layer:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return SearchResult(None, None, expanded, generated)
+
+
+def jump_point_search(problem):
+    """
+    Searches for a path between two positions using the walls Grid of the
+    problem directly, as A* search with the Manhattan distance, but only
+    expanding jump points. From each position the search moves in a
+    straight line until it reaches a position where a shortest path might
+    have to turn. The open positions along the way are passed over
+    without being expanded or queued, which on open layouts cuts the
+    number of expansions greatly.
+
+    With moves in only four directions, a shortest path can always be
+    chosen in which a turn from moving north or south to moving east or
+    west only happens where a wall ends beside the path. So a move north
+    or south stops at such a position, and a move east or west stops at
+    any position from which a move north or south would reach a jump
+    point. The path found has as few moves as any other.
+
+    The problem must have a single goal, held as problem.goal, its walls
+    as problem.walls and every move must cost the same, as with a
+    PositionSearchProblem that has no cost function.
+    """
+    walls = problem.walls
+    start = problem.get_start_state()
+    goal = problem.goal
+
+    def blocked(x, y):
+        return x < 0 or y < 0 or x >= walls.width or y >= walls.height or walls[x][y]
+
+    def jump_vertical(x, y, dy):
+        while True:
+            y += dy
+
+            if blocked(x, y):
+                return None
+
+            if (x, y) == goal:
+                return x, y
+
+            for side in (1, -1):
+                if not blocked(x + side, y) and blocked(x + side, y - dy):
+                    return x, y
+
+    def jump_horizontal(x, y, dx):
+        while True:
+            x += dx
+
+            if blocked(x, y):
+                return None
+
+            if (x, y) == goal:
+                return x, y
+
+            if jump_vertical(x, y, 1) is not None or jump_vertical(x, y, -1) is not None:
+                return x, y
+
+    def get_directions(state, arrival):
+        """
+        Returns the directions worth moving in from a jump point, given
+        the direction the jump point was reached in.
+        """
+        if arrival is None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+        dx, dy = Actions.directions[arrival]
+
+        if dy == 0:
+            return [(dx, 0), (0, 1), (0, -1)]
+
+        x, y = state
+        directions = [(0, dy)]
+
+        for side in (1, -1):
+            if not blocked(x + side, y) and blocked(x + side, y - dy):
+                directions.append((side, 0))
+
+        return directions
+
+    nodes = NodeArena()
+    reached = {start: nodes.add(start)}
+    closed = set()
+    expanded = 0
+    generated = 0
+
+    frontier = PriorityQueue()
+    frontier.push(start, manhattan_distance(start, goal))
+
+    while not frontier.is_empty():
+        state = frontier.pop()
+        node = reached[state]
+
+        if state == goal:
+            actions = get_jump_actions(nodes, node)
+            return SearchResult(actions, len(actions), expanded, generated)
+
+        closed.add(state)
+        expanded += 1
+        cost = nodes.get_cost(node)
+
+        for dx, dy in get_directions(state, nodes.get_action(node)):
+            if dy == 0:
+                jump_point = jump_horizontal(state[0], state[1], dx)
+            else:
+                jump_point = jump_vertical(state[0], state[1], dy)
+
+            if jump_point is None or jump_point in closed:
+                continue
+
+            generated += 1
+            action = Actions.vector_to_direction((dx, dy))
+            jump_cost = cost + manhattan_distance(state, jump_point)
+            jump_node = reached.get(jump_point)
+
+            if jump_node is None:
+                reached[jump_point] = nodes.add(jump_point, node, action, jump_cost)
+            elif jump_cost < nodes.get_cost(jump_node):
+                nodes.relink(jump_node, node, action, jump_cost)
+            else:
+                continue
+
+            frontier.update(jump_point, jump_cost + manhattan_distance(jump_point, goal))
+
+    return SearchResult(None, None, expanded, generated)
+
+
+def get_jump_actions(nodes, node):
+    """
+    Returns the actions from the start to a node found by jump point
+    search. Each node holds the direction of the straight line to it from
+    its parent, which is repeated once for each position along the line.
+    """
+    actions = []
+
+    while nodes.get_parent(node) != NodeArena.NO_PARENT:
+        parent = nodes.get_parent(node)
+        distance = manhattan_distance(nodes.get_state(parent), nodes.get_state(node))
+        actions.extend([nodes.get_action(node)] * distance)
+        node = parent
+
+    actions.reverse()
+
+    return actions
+
+
+# The searches that can be chosen by name, such as with the fn option of
+# a SearchAgent, along with the heuristics for those that take one.
+SEARCH_FUNCTIONS = {
+    'dfs': depth_first_search,
+    'bfs': breadth_first_search,
+    'ucs': uniform_cost_search,
+    'astar': a_star_search,
+    'greedy': greedy_search,
+    'bidirectional': bidirectional_search,
+    'jps': jump_point_search
+}
+
+HEURISTICS = {
+    'null': null_heuristic,
+    'manhattan': manhattan_heuristic
+}
@@ -1,3 +1,5 @@
+from pacumen.mechanics.agent_action import Actions
+from pacumen.mechanics.agent_direction import Direction
 from pacumen.library.utilities import raise_not_defined
 
 
@@ -20,3 +22,82 @@ class SearchProblem:
     # noinspection PyUnusedLocal
     def get_cost_of_actions(self, actions):
         raise_not_defined()
+
+
+class PositionSearchProblem(SearchProblem):
+    """
+    The problem of finding a path for Pacumen from his position to a goal
+    position. The states are positions and the successors of a position
+    are the positions next to it that are not walls. By default each move
+    costs 1. A cost function can be provided, which is given the position
+    moved to and returns the cost of the move.
+
+    Since every move can be undone, the predecessors of a position are
+    just its neighbors, reached with the reverse of the move. This is
+    what lets the search run backward from the goal as well.
+    """
+    def __init__(self, game_state, goal=(1, 1), start=None, cost_function=None):
+        layout = game_state.get_layout()
+
+        self.walls = layout.walls
+        self.legal_actions = layout.legal_actions
+        self.start = start if start is not None else game_state.get_pacumen_position()
+        self.goal = goal
+        self.cost_function = cost_function
+
+        if self.walls[goal[0]][goal[1]]:
+            raise Exception("The goal " + str(goal) + " is a wall.")
+
+    def get_start_state(self):
+        return self.start
+
+    def is_goal_state(self, state):
+        return state == self.goal
+
+    def get_successors(self, state):
+        successors = []
+        x, y = state
+
+        for action in self.legal_actions[state]:
+            if action == Direction.STOP:
+                continue
+
+            dx, dy = Actions.directions[action]
+            next_state = (x + dx, y + dy)
+            successors.append((next_state, action, self.get_cost(next_state)))
+
+        return successors
+
+    def get_predecessors(self, state):
+        """
+        Returns (predecessor, action, cost) triples, where the action is
+        the one that moves from the predecessor to the state.
+        """
+        cost = self.get_cost(state)
+
+        return [(neighbor, Actions.reverse_direction(action), cost)
+                for neighbor, action, _ in self.get_successors(state)]
+
+    def get_cost(self, position):
+        if self.cost_function is None:
+            return 1
+
+        return self.cost_function(position)
+
+    def get_cost_of_actions(self, actions):
+        """
+        Returns the cost of a sequence of actions from the start. If any of
+        the actions is illegal, None is returned.
+        """
+        x, y = self.start
+        cost = 0
+
+        for action in actions:
+            if action not in self.legal_actions[(x, y)]:
+                return None
+
+            dx, dy = Actions.directions[action]
+            x, y = x + dx, y + dy
+            cost += self.get_cost((x, y))
+
+        return cost
@@ -1,4 +1,6 @@
 import heapq
+from array import array
+from collections import deque
 
 
 class Node:
@@ -18,6 +20,91 @@ class Node:
         return "({0},{1},{2})".format(self.state, self.path, self.priority)
 
 
+class NodeArena:
+    """
+    Holds all of the nodes of a search tree. Rather than each node being an
+    object with the whole path to it, as a Node is, a node here is just an
+    index into a few parallel arrays: the state, the index of the parent
+    node, a small code for the action taken from the parent and the cost
+    of the path so far. Each action is given its code the first time it
+    is seen. A node then takes the same small amount of memory no matter
+    how deep it is, and the path to a node is only built when it is asked
+    for, which is usually just once, for a goal.
+    """
+    NO_PARENT = -1
+
+    def add(self, state, parent=NO_PARENT, action=None, cost=0):
+        """
+        Adds a node for the state and returns its index.
+        """
+        self.states.append(state)
+        self.parents.append(parent)
+        self.action_codes.append(self.get_action_code(action))
+        self.costs.append(cost)
+
+        return len(self.states) - 1
+
+    def relink(self, node, parent, action, cost):
+        """
+        Changes the parent of a node, such as when a cheaper path to its
+        state is found. This should only be done for a node that has not
+        been expanded, as the costs of its children are not changed.
+        """
+        self.parents[node] = parent
+        self.action_codes[node] = self.get_action_code(action)
+        self.costs[node] = cost
+
+    def get_action_code(self, action):
+        code = self.action_index.get(action)
+
+        if code is None:
+            code = len(self.actions)
+            self.actions.append(action)
+            self.action_index[action] = code
+
+        return code
+
+    def get_state(self, node):
+        return self.states[node]
+
+    def get_parent(self, node):
+        return self.parents[node]
+
+    def get_cost(self, node):
+        return self.costs[node]
+
+    def get_action(self, node):
+        return self.actions[self.action_codes[node]]
+
+    def get_path(self, node):
+        """
+        Follows the parents back from the node to the root and returns the
+        actions along the way, in the order they are taken.
+        """
+        path = []
+        parents = self.parents
+
+        while parents[node] != NodeArena.NO_PARENT:
+            path.append(self.actions[self.action_codes[node]])
+            node = parents[node]
+
+        path.reverse()
+
+        return path
+
+    def __init__(self):
+        self.states = []
+        self.parents = array('q')
+        self.action_codes = array('I')
+        self.costs = array('d')
+
+        self.actions = []
+        self.action_index = {}
+
+    def __len__(self):
+        return len(self.states)
+
+
 class Stack:
     """
     A container with a last-in-first-out (LIFO) queuing policy.
@@ -37,16 +124,18 @@ class Stack:
 
 class Queue:
     """
-    A container with a first-in-first-out (FIFO) queuing policy.
+    A container with a first-in-first-out (FIFO) queuing policy. The items
+    are held in a deque, so that both pushing an item on to one end and
+    popping an item off the other take constant time.
     """
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self, item):
-        self.list.insert(0, item)
+        self.list.append(item)
 
     def pop(self):
-        return self.list.pop()
+        return self.list.popleft()
 
     def is_empty(self):
         return len(self.list) == 0
@@ -57,22 +146,52 @@ class PriorityQueue:
     Implements a priority queue data structure. Each inserted item
     has a priority associated with it and the client is usually interested
     in quick retrieval of the lowest-priority item in the queue.
+
+    Each entry of the heap is a list of the priority, a count that keeps
+    entries with equal priorities in the order they were pushed, the item
+    and whether the entry is still live. The live entries of each item are
+    also kept in a dictionary, the entry finder. This means an item can be
+    found without scanning the heap. Changing the priority of an item marks
+    its entry as removed and pushes a new entry; removed entries are just
+    skipped when they come to the top of the heap. Items that can't be
+    hashed can still be queued, but finding them needs a scan.
     """
     def __init__(self):
         self.heap = []
         self.count = 0
+        self.size = 0
+        self.removed = 0
+        self.entry_finder = {}
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
-        heapq.heappush(self.heap, entry)
+        self.add(item, priority, self.count)
         self.count += 1
 
+    def add(self, item, priority, count):
+        entry = [priority, count, item, True]
+        heapq.heappush(self.heap, entry)
+        self.size += 1
+
+        try:
+            self.entry_finder.setdefault(item, []).append(entry)
+        except TypeError:
+            pass
+
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
-        return item
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+
+            if entry[3]:
+                self.size -= 1
+                self.forget(entry)
+                return entry[2]
+
+            self.removed -= 1
+
+        raise IndexError("pop from an empty priority queue")
 
     def is_empty(self):
-        return len(self.heap) == 0
+        return self.size == 0
 
     def update(self, item, priority):
         """
@@ -80,16 +199,62 @@ class PriorityQueue:
         If item already in priority queue with equal or lower priority, do nothing.
         If item not in priority queue, do the same thing as self.push.
         """
-        for index, (p, c, i) in enumerate(self.heap):
-            if i == item:
-                if p <= priority:
-                    break
-                del self.heap[index]
-                self.heap.append((priority, c, item))
-                heapq.heapify(self.heap)
-                break
-        else:
+        entry = self.find(item)
+
+        if entry is None:
             self.push(item, priority)
+        elif entry[0] > priority:
+            # The new entry keeps the count of the old one, so the item
+            # keeps its place among items of equal priority.
+            self.remove(entry)
+            self.add(item, priority, entry[1])
+
+    def find(self, item):
+        """
+        Returns the live entry of the item with the lowest priority, or
+        None if the item isn't in the queue.
+        """
+        try:
+            entries = self.entry_finder.get(item)
+        except TypeError:
+            entries = [entry for entry in self.heap if entry[3] and entry[2] == item]
+
+        if not entries:
+            return None
+
+        return min(entries)
+
+    def remove(self, entry):
+        entry[3] = False
+        self.size -= 1
+        self.removed += 1
+        self.forget(entry)
+
+        # Once most of the heap is removed entries, it is rebuilt from the
+        # live ones so that it doesn't keep growing.
+        if self.removed > self.size and self.removed > 64:
+            self.heap = [entry for entry in self.heap if entry[3]]
+            heapq.heapify(self.heap)
+            self.removed = 0
+
+    def forget(self, entry):
+        item = entry[2]
+
+        try:
+            entries = self.entry_finder.get(item)
+        except TypeError:
+            return
+
+        entries.remove(entry)
+
+        if not entries:
+            del self.entry_finder[item]
+
+    def __contains__(self, item):
+        return self.find(item) is not None
+
+    def __len__(self):
+        return self.size
 
 
 class StaticPriorityQueue:
@@ -1,5 +1,5 @@
 from pacumen.mechanics.agent_action import Actions
-from pacumen.mechanics.agent_direction import Direction
+from pacumen.mechanics.agent_configuration import Configuration
 from pacumen.library.utilities import nearest_point, manhattan_distance
 
 
@@ -18,17 +18,25 @@ class GhostRules:
 
     @staticmethod
     def get_legal_actions(state, ghost_index):
-        config = state.get_ghost_state(ghost_index).configuration
-        possible_actions = Actions.get_possible_actions(config, state.data.layout.walls)
-        reverse = Actions.reverse_direction(config.direction)
+        """
+        The possible actions are worked out as a bit mask of direction
+        codes. Taking away stopping and, unless it is the only way left,
+        turning back are then just bit operations.
+        """
+        config = state.data.agent_states[ghost_index].configuration
+        layout = state.data.layout
+        possible = Actions.get_possible_actions_mask(config, layout.walls, layout.legal_action_masks)
+        possible &= ~Actions.STOP_BIT
 
-        if Direction.STOP in possible_actions:
-            possible_actions.remove(Direction.STOP)
+        code = Actions.direction_to_code.get(config.direction)
 
-        if reverse in possible_actions and len(possible_actions) > 1:
-            possible_actions.remove(reverse)
+        if code is not None:
+            reverse_bit = 1 << Actions.code_to_reverse[code]
 
-        return possible_actions
+            if possible & reverse_bit and possible != reverse_bit:
+                possible &= ~reverse_bit
+
+        return Actions.mask_to_actions(possible)
 
     @staticmethod
     def apply_action(state, action, ghost_index):
@@ -51,7 +59,10 @@ class GhostRules:
         timer = ghost_state.scared_timer
 
         if timer == 1:
-            ghost_state.configuration.position = nearest_point(ghost_state.configuration.position)
+            # The configuration may be shared with earlier states, so it
+            # is replaced rather than changed.
+            configuration = ghost_state.configuration
+            ghost_state.configuration = Configuration(nearest_point(configuration.position), configuration.direction)
 
         ghost_state.scared_timer = max(0, timer - 1)
 
@@ -65,8 +76,10 @@ class GhostRules:
                 ghost_position = ghost_state.configuration.get_position()
 
                 if GhostRules.can_eat_pacumen(pacman_position, ghost_position):
+                    ghost_state = state.data.copy_agent_state(index)
                     GhostRules.collide(state, ghost_state, index)
         else:
+            # The moving ghost already has its own copy of its state.
             ghost_state = state.data.agent_states[agent_index]
             ghost_position = ghost_state.configuration.get_position()
 
@@ -83,7 +96,9 @@ class GhostRules:
             state.data.score_change += 200
             GhostRules.spawn_ghost(state, ghost_state)
             ghost_state.scared_timer = 0
-            state.data.eaten[agent_index] = True
+            eaten = list(state.data.eaten)
+            eaten[agent_index] = True
+            state.data.eaten = tuple(eaten)
         else:
             if not state.data.check_for_win():
                 state.data.score_change -= 500
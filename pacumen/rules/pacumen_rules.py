@@ -19,7 +19,10 @@ class PacumenRules:
         Based on the current configuration of Pacumen as well as the walls,
         as provided by the layout, a list of possible actions is returned.
         """
-        return Actions.get_possible_actions(state.get_pacumen_state().configuration, state.data.layout.walls)
+        layout = state.data.layout
+        configuration = state.data.agent_states[0].configuration
+
+        return Actions.get_possible_actions(configuration, layout.walls, layout.legal_actions)
 
     @staticmethod
     def apply_action(state, action):
@@ -58,22 +61,18 @@ class PacumenRules:
         # Eat food pellet.
         if state.data.dots[x][y]:
             state.data.score_change += 10
-            state.data.dots = state.data.dots.copy()
-            state.data.dots[x][y] = False
-
+            state.data.remove_dot(position)
             state.data.set_dot_eaten_location(position)
 
-            num_dots = state.get_num_dots()
-
-            if num_dots == 0 and not state.data.check_for_loss():
+            if state.data.num_dots == 0 and not state.data.check_for_loss():
                 state.data.score_change += 500
                 state.data.is_a_win()
 
         # Eat power pellet.
-        if position in state.get_pellets():
-            state.data.pellets.remove(position)
+        if state.data.pellets[x][y]:
+            state.data.remove_pellet(position)
             state.data.set_pellet_eaten_location(position)
 
             # Reset all ghosts' scared timers.
             for index in range(1, len(state.data.agent_states)):
-                state.data.agent_states[index].scared_timer = PacumenRules.SCARED_TIME
+                state.data.copy_agent_state(index).scared_timer = PacumenRules.SCARED_TIME
@@ -127,6 +127,9 @@ setup(
     zip_safe=False,
     include_package_data=True,
     python_requires=REQUIRES_PYTHON,
+    extras_require={
+        'learning': ['numpy']
+    },
     classifiers=[
         # Reference: <URL:https://pypi.org/pypi?:action=list_classifiers>
         'License :: OSI Approved :: MIT License',